@@ -0,0 +1,80 @@
+"""Compare encode/decode cost of document fields.
+
+Every round trip is what happens to a tuple field on save and load:
+``field.to_db`` and msgpack packing, msgpack unpacking and
+``field.to_python``.
+
+DictField is the baseline for MsgpackField: both are packed natively,
+MsgpackField only adds parsing of JSON text stored by JsonField.
+
+    python bench_fields.py --number 20000
+
+"""
+import argparse
+import random
+import timeit
+
+import msgpack
+
+from tarantism import fields
+from tarantism.contrib import fields as contrib_fields
+
+
+def make_document(keys):
+    """Document shaped like Card.sentiment_details."""
+    random.seed(keys)
+    return {
+        'sentiment': random.choice(['positive', 'negative', 'neutral']),
+        'objectivity': random.random(),
+        'entities': [
+            {
+                'name': u'entity %d' % i,
+                'type': random.choice(['person', 'organization', 'location']),
+                'score': random.random(),
+                'mentions': [random.randint(0, 10000) for _ in range(3)],
+            }
+            for i in range(keys)
+        ],
+        'scores': {u'class_%d' % i: random.random() for i in range(keys)},
+    }
+
+
+def bench(field, document, number):
+    packed = msgpack.packb(field.to_db(document))
+
+    encode = timeit.timeit(
+        lambda: msgpack.packb(field.to_db(document)), number=number
+    )
+    decode = timeit.timeit(
+        lambda: field.to_python(msgpack.unpackb(packed, encoding='utf-8')),
+        number=number
+    )
+
+    return encode, decode, len(packed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--number', type=int, default=20000)
+    parser.add_argument('--keys', type=int, default=20,
+                        help='Entities and scores in document.')
+    args = parser.parse_args()
+    number, keys = args.number, args.keys
+
+    document = make_document(keys)
+
+    candidates = [
+        ('JsonField', fields.JsonField()),
+        ('contrib.JsonField', contrib_fields.JsonField()),
+        ('DictField', fields.DictField()),
+        ('MsgpackField', fields.MsgpackField()),
+    ]
+
+    print '{:<20} {:>10} {:>10} {:>8}'.format('field', 'encode, s', 'decode, s', 'bytes')
+    for name, field in candidates:
+        encode, decode, size = bench(field, document, number)
+        print '{:<20} {:>10.3f} {:>10.3f} {:>8}'.format(name, encode, decode, size)
+
+
+if __name__ == '__main__':
+    main()
@@ -228,8 +228,9 @@ def runner(id_thread):
                 data=data
             )
 
-            card.save()
-            card_data.save()
+            with Card.pipeline():
+                card.save()
+                card_data.save()
 
             if i % 10000 == 0:
                 speed_list.append(i / int(_working_time()))
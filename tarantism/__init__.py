@@ -3,6 +3,8 @@ from tarantism.connection import *
 from tarantism.fields import *
 from tarantism.models import *
 from tarantism.queryset import *
+from tarantism.session import *
+from tarantism.buffer import *
 from tarantism.exceptions import *
 
 
@@ -0,0 +1,242 @@
+import atexit
+import os
+import threading
+import weakref
+from collections import deque
+from time import time
+
+from tarantism.exceptions import WriteBufferFull
+
+__all__ = ['WriteBuffer', 'close_write_buffers']
+
+_buffers = weakref.WeakSet()
+
+
+class WriteBuffer(object):
+    """Queue of write requests sent in background batches.
+
+    Requests are flushed by background thread in one pipeline once
+    ``batch_size`` of them are queued or ``flush_interval`` seconds
+    passed since the oldest one. When ``max_pending`` requests are queued
+    :meth:`put` blocks until there is room, up to ``put_timeout``
+    seconds, then raises :class:`~tarantism.exceptions.WriteBufferFull`.
+
+    Failed requests do not stop flushing, they are passed to
+    ``on_error(request, exception)`` and the latest ones are kept in
+    :attr:`errors`.
+
+    :param connection: connection safe to use from several threads,
+        normally :class:`~tarantism.core.AsyncConnection`, or callable
+        returning it. Callable is called for every batch, so process
+        forked after the buffer was used sends through its own connection.
+
+    """
+    def __init__(self,
+                 connection,
+                 batch_size=1000,
+                 flush_interval=1.0,
+                 max_pending=10000,
+                 put_timeout=None,
+                 on_error=None):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.put_timeout = put_timeout
+        self.on_error = on_error
+
+        self.errors = deque(maxlen=100)
+
+        self._requests = deque()
+        self._in_flight = 0
+        self._flush_waiters = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+        self._pid = os.getpid()
+
+        _buffers.add(self)
+
+    def __len__(self):
+        return len(self._requests) + self._in_flight
+
+    def put(self, method, *args, **kwargs):
+        """Queue ``connection.<method>(*args)`` request.
+
+        :param on_sent: callable called without arguments once request
+            was sent, whether it succeeded or not.
+
+        """
+        on_sent = kwargs.pop('on_sent', None)
+        if kwargs:
+            raise TypeError('Unexpected keyword arguments {names}.'.format(
+                names=', '.join(kwargs)
+            ))
+
+        self._check_fork()
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Write buffer is closed.')
+
+            self._ensure_thread()
+
+            deadline = None
+            if self.put_timeout is not None:
+                deadline = time() + self.put_timeout
+
+            while len(self._requests) >= self.max_pending:
+                timeout = None if deadline is None else deadline - time()
+                if timeout is not None and timeout <= 0:
+                    raise WriteBufferFull(
+                        '{count} requests are pending.'.format(
+                            count=len(self._requests)
+                        ))
+                self._condition.wait(timeout)
+
+            self._requests.append((time(), method, args, on_sent))
+            if len(self._requests) >= self.batch_size:
+                self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until requests queued before the call are sent."""
+        self._check_fork()
+        deadline = None if timeout is None else time() + timeout
+
+        with self._condition:
+            self._flush_waiters += 1
+            self._condition.notify_all()
+            try:
+                while self._requests or self._in_flight:
+                    if self._thread is None or not self._thread.is_alive():
+                        self._send_batch_locked()
+                        continue
+
+                    remaining = None if deadline is None else deadline - time()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self._flush_waiters -= 1
+
+        return True
+
+    def close(self, timeout=None):
+        """Flush pending requests and stop background thread."""
+        self._check_fork()
+
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+
+        self.flush(timeout)
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _check_fork(self):
+        if self._pid == os.getpid():
+            return
+
+        # Queue and thread belong to the parent process, its lock could be
+        # held by parent thread at the moment of fork.
+        self._condition = threading.Condition()
+        self._requests = deque()
+        self._in_flight = 0
+        self._flush_waiters = 0
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='WriteBuffer')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        with self._condition:
+            while True:
+                while not self._closed and not self._batch_ready():
+                    self._condition.wait(self._wait_timeout())
+
+                if not self._requests:
+                    if self._closed:
+                        return
+                    continue
+
+                self._send_batch_locked()
+
+    def _batch_ready(self):
+        if not self._requests:
+            return False
+
+        if self._flush_waiters or len(self._requests) >= self.batch_size:
+            return True
+
+        return time() - self._requests[0][0] >= self.flush_interval
+
+    def _wait_timeout(self):
+        if not self._requests:
+            return None
+
+        return max(0, self._requests[0][0] + self.flush_interval - time())
+
+    def _send_batch_locked(self):
+        batch = []
+        while self._requests and len(batch) < self.batch_size:
+            batch.append(self._requests.popleft())
+
+        self._in_flight += len(batch)
+        self._condition.notify_all()
+        self._condition.release()
+        try:
+            self._send(batch)
+        finally:
+            self._condition.acquire()
+            self._in_flight -= len(batch)
+            self._condition.notify_all()
+
+    def _get_connection(self):
+        if callable(self.connection):
+            return self.connection()
+        return self.connection
+
+    def _send(self, batch):
+        try:
+            connection = self._get_connection()
+            with connection.pipeline(raise_on_error=False) as pipeline:
+                for _, method, args, _ in batch:
+                    getattr(connection, method)(*args)
+        except Exception as e:
+            for _, method, args, _ in batch:
+                self._report((method, args), e)
+        else:
+            for (_, method, args, _), future in zip(batch, pipeline.futures):
+                exception = future.exception()
+                if exception is not None:
+                    self._report((method, args), exception)
+
+        for _, method, args, on_sent in batch:
+            if on_sent is None:
+                continue
+            try:
+                on_sent()
+            except Exception as e:
+                self._report((method, args), e)
+
+    def _report(self, request, exception):
+        self.errors.append((request, exception))
+
+        if self.on_error is not None:
+            self.on_error(request, exception)
+
+
+def close_write_buffers(timeout=None):
+    """Flush and close all write buffers, called on interpreter exit."""
+    for write_buffer in list(_buffers):
+        write_buffer.close(timeout)
+
+
+atexit.register(close_write_buffers)
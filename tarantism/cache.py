@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+
+__all__ = ['ModelCache', 'POLICY_LRU', 'POLICY_FIFO']
+
+POLICY_LRU = 'lru'
+
+POLICY_FIFO = 'fifo'
+
+
+class ModelCache(object):
+    """Bounded cache of raw tuples keyed by primary key.
+
+    Enabled per model with ``meta = {'cache': {...}}``, options are
+    passed to constructor.
+
+    :param max_size: maximum number of cached rows.
+    :param ttl: seconds row stays cached, forever if None.
+    :param policy: what to evict when full, least recently used row
+        (``'lru'``) or the oldest one (``'fifo'``).
+
+    Row read from database is stored with token taken by :meth:`begin`
+    before the read, :meth:`set` ignores it if the key was invalidated
+    since, so read racing with write does not cache stale row.
+
+    """
+    def __init__(self, max_size=1000, ttl=None, policy=POLICY_LRU):
+        if policy not in (POLICY_LRU, POLICY_FIFO):
+            raise ValueError('Unknown cache policy {policy}.'.format(
+                policy=policy
+            ))
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.policy = policy
+
+        self.hits = 0
+        self.misses = 0
+
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Generation of the latest invalidation of recently invalidated
+        # keys, tokens older than forgotten ones are not trusted.
+        self._generation = 0
+        self._invalidated = OrderedDict()
+        self._max_invalidated = max(max_size, 1000)
+        self._oldest_trusted = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, key):
+        """Return cached row or None."""
+        with self._lock:
+            entry = self._rows.get(key)
+
+            if entry is not None and entry[0] is not None and entry[0] <= time.time():
+                del self._rows[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if self.policy == POLICY_LRU:
+                del self._rows[key]
+                self._rows[key] = entry
+
+            self.hits += 1
+            return entry[1]
+
+    def begin(self):
+        """Return token to pass to :meth:`set` for row about to be read."""
+        with self._lock:
+            return self._generation
+
+    def set(self, key, row, token=None):
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if token is not None and (
+                token < self._oldest_trusted or
+                self._invalidated.get(key, 0) > token
+            ):
+                return
+
+            self._rows.pop(key, None)
+            self._rows[key] = (expires_at, row)
+
+            while len(self._rows) > self.max_size:
+                self._rows.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._rows.pop(key, None)
+
+            self._generation += 1
+            self._invalidated.pop(key, None)
+            self._invalidated[key] = self._generation
+            while len(self._invalidated) > self._max_invalidated:
+                _, generation = self._invalidated.popitem(last=False)
+                self._oldest_trusted = generation
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self.hits = 0
+            self.misses = 0
+
+            self._generation += 1
+            self._invalidated.clear()
+            self._oldest_trusted = self._generation
+
+
+def make_cache_key(key):
+    """Return hashable cache key for select key, None if not cacheable."""
+    if isinstance(key, (list, tuple)):
+        if len(key) != 1:
+            return None
+        key = key[0]
+
+    if isinstance(key, (dict, list)):
+        return None
+
+    return key
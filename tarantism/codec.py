@@ -0,0 +1,160 @@
+from tarantism.fields import BaseField
+
+__all__ = ['compile_codec']
+
+
+def compile_codec(model_class):
+    """Generate ``_decode`` and ``_encode`` functions for model class.
+
+    ``_decode(values)`` builds model instance loaded from database
+    straight from tuple, ``_encode(model)`` returns tuple for insert.
+    Both unroll the loop over ``_fields_ordered`` so per-row work is one
+    function call per field conversion and no intermediate dicts.
+
+    """
+    fields = [
+        model_class._fields[field_name]
+        for field_name in model_class._fields_ordered
+    ]
+    namespace = {
+        'model_class': model_class,
+        'new': object.__new__,
+        'slow_decode': lambda values: _slow_decode(model_class, values),
+    }
+
+    source = '\n'.join([
+        _decode_source(model_class, fields, namespace),
+        _encode_source(model_class, fields, namespace),
+    ])
+    exec source in namespace
+
+    if not _supports_fast_decode(model_class, fields):
+        namespace['_decode'] = namespace['slow_decode']
+
+    return namespace['_decode'], namespace['_encode']
+
+
+def _decode_source(model_class, fields, namespace):
+    meta = model_class._meta
+
+    if meta.get('lazy', False):
+        # Fields are decoded by LazyFieldDescriptor when read.
+        return '\n'.join([
+            'def _decode(values):',
+            '    model = new(model_class)',
+            '    model._raw = values',
+            '    model._decoded = {}',
+            '    model._exists_in_db = True',
+            '    model._dirty = set()',
+            '    return model',
+        ])
+
+    lines = [
+        'def _decode(values):',
+        '    if len(values) < {count}:'.format(count=len(fields)),
+        '        return slow_decode(values)',
+    ]
+
+    for number, field in enumerate(fields):
+        value = 'values[{number}]'.format(number=number)
+        if _overrides(field, 'to_python'):
+            namespace['to_python_%d' % number] = field.to_python
+            value = 'to_python_{number}({value})'.format(
+                number=number, value=value
+            )
+        lines.append('    v{number} = {value}'.format(
+            number=number, value=value
+        ))
+
+        if field.default is not None:
+            namespace['default_%d' % number] = field.default
+            default = 'default_{number}'.format(number=number)
+            if callable(field.default):
+                default += '()'
+            lines.extend([
+                '    if v{number} is None:'.format(number=number),
+                '        v{number} = {default}'.format(
+                    number=number, default=default
+                ),
+            ])
+
+    if meta.get('compact', False):
+        storage = '    model._values = [' + ', '.join(
+            'v{number}'.format(number=number) for number in range(len(fields))
+        ) + ']'
+    else:
+        storage = '    model._data = {' + ', '.join(
+            '{name!r}: v{number}'.format(name=field.name, number=number)
+            for number, field in enumerate(fields)
+        ) + '}'
+
+    lines.extend([
+        '    model = new(model_class)',
+        storage,
+    ])
+
+    if any(field.mutable for field in fields):
+        # Stored columns are snapshots of mutable fields once read.
+        lines.append('    model._raw = values')
+
+    lines.extend([
+        '    model._exists_in_db = True',
+        '    model._dirty = set()',
+        '    return model',
+    ])
+
+    return '\n'.join(lines)
+
+
+def _encode_source(model_class, fields, namespace):
+    compact = model_class._meta.get('compact', False)
+
+    lines = [
+        'def _encode(model):',
+        '    data = model.{storage}'.format(
+            storage='_values' if compact else '_data'
+        ),
+        '    return (',
+    ]
+
+    for number, field in enumerate(fields):
+        namespace['to_db_%d' % number] = field.to_db
+        lines.append('        to_db_{number}({value}),'.format(
+            number=number,
+            value='data[{0}]'.format(number) if compact
+            else 'data.get({0!r})'.format(field.name)
+        ))
+
+    lines.append('    )')
+
+    return '\n'.join(lines)
+
+
+def _slow_decode(model_class, values):
+    model = model_class.from_dict(model_class._values_to_dict(values))
+    model._raw = values
+    model._exists_in_db = True
+    model._dirty.clear()
+
+    return model
+
+
+def _overrides(field, method_name):
+    method = getattr(type(field), method_name)
+
+    return method.__func__ is not getattr(BaseField, method_name).__func__
+
+
+def _supports_fast_decode(model_class, fields):
+    """Fast decode skips ``__init__`` and field descriptors."""
+    for base in model_class.__mro__:
+        if '__init__' in vars(base) or 'reset' in vars(base):
+            if base.__module__ != 'tarantism.models':
+                return False
+            break
+
+    meta = model_class._meta
+    if meta.get('compact', False) or meta.get('lazy', False):
+        return True
+
+    return not any(_overrides(field, '__set__') for field in fields)
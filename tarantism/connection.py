@@ -1,15 +1,24 @@
 
+import os
 import sys
+import threading
+from multiprocessing import util as multiprocessing_util
+from collections import deque
+from contextlib import contextmanager
+from time import time
 
-from tarantool import DatabaseError
+from tarantool import DatabaseError, NetworkError
 
-from tarantism.core import Connection
+from tarantism.core import AsyncConnection, Connection, Space
 
 __all__ = [
     'DEFAULT_ALIAS', 'DEFAULT_HOST', 'DEFAULT_PORT', 'DEFAULT_SPACE',
     'ConnectionError',
+    'ConnectionPool', 'PooledConnection',
     'connect', 'disconnect',
-    'register_connection', 'get_connection', 'get_space',
+    'register_connection', 'get_connection', 'get_pool', 'get_space',
+    'get_async_connection',
+    'warm_up', 'warm_up_after_fork',
 ]
 
 
@@ -22,6 +31,15 @@ _connections = {}
 _spaces = {}
 """Aliases to Tarantool space objects mapping."""
 
+_async_connections = {}
+"""Aliases to multiplexed asynchronous connection objects mapping."""
+
+_owner_pid = os.getpid()
+"""Process which opened connections stored in the registry."""
+
+_warm_up_hooks = []
+"""Keeps after fork hooks alive, multiprocessing holds only weak refs."""
+
 DEFAULT_ALIAS = 'default'
 
 DEFAULT_HOST = 'localhost'
@@ -30,15 +48,256 @@ DEFAULT_PORT = 33013
 
 DEFAULT_SPACE = 0
 
+POOL_SETTINGS = ('min_size', 'max_size', 'checkout_timeout', 'idle_timeout')
+"""Connection settings which configure alias pool instead of connection."""
+
 
 class ConnectionError(Exception):
     """Wraps tarantool driver connection errors."""
     pass
 
 
+class ConnectionPool(object):
+    """Bounded thread-safe pool of connections to one Tarantool instance.
+
+    :param factory: callable which opens new connection.
+    :param min_size: connections kept open regardless of idle time.
+    :param max_size: upper bound of simultaneously open connections.
+    :param checkout_timeout: seconds to wait for free connection,
+        ``None`` means wait forever.
+    :param idle_timeout: seconds after which idle connections above
+        ``min_size`` are closed, ``None`` disables eviction.
+
+    """
+    def __init__(self, factory, min_size=1, max_size=10,
+                 checkout_timeout=None, idle_timeout=None):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError(
+                'Invalid pool bounds: min_size={min_size}, '
+                'max_size={max_size}.'.format(
+                    min_size=min_size, max_size=max_size
+                )
+            )
+
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.idle_timeout = idle_timeout
+
+        self._condition = threading.Condition(threading.Lock())
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+    def acquire(self, timeout=None):
+        """Borrow connection, opening new one if pool is not full.
+
+        :param timeout: overrides pool ``checkout_timeout``.
+
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = None if timeout is None else time() + timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise ConnectionError('Connection pool is closed.')
+
+                self._evict_idle()
+
+                if self._idle:
+                    # LIFO keeps hot connections hot and lets the rest expire.
+                    return self._idle.pop()[0]
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                remaining = None if deadline is None else deadline - time()
+                if remaining is not None and remaining <= 0:
+                    raise ConnectionError(
+                        'Connection pool checkout timed out after '
+                        '{timeout} seconds.'.format(timeout=timeout)
+                    )
+
+                self._condition.wait(remaining)
+
+        try:
+            return self.factory()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection, discard=False):
+        """Return borrowed connection to the pool.
+
+        :param discard: close connection instead of reusing it.
+
+        """
+        with self._condition:
+            if not (self._closed or discard):
+                self._idle.append((connection, time()))
+                self._condition.notify()
+                return
+
+            self._size -= 1
+            self._condition.notify()
+
+        _close_quietly(connection)
+
+    @contextmanager
+    def connection(self):
+        """Borrow connection for the duration of the block.
+
+        Connections which failed with network error are discarded.
+
+        """
+        connection = self.acquire()
+        discard = False
+        try:
+            yield connection
+        except NetworkError:
+            discard = True
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+    def fill(self):
+        """Open connections up to ``min_size``."""
+        with self._condition:
+            missing = max(self.min_size - self._size, 0)
+            self._size += missing
+
+        for opened in xrange(missing):
+            try:
+                connection = self.factory()
+            except Exception:
+                with self._condition:
+                    self._size -= missing - opened
+                    self._condition.notify_all()
+                raise
+
+            self.release(connection)
+
+    def close(self):
+        """Close idle connections, borrowed ones are closed on release."""
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+
+        for connection in idle:
+            _close_quietly(connection)
+
+    def _evict_idle(self):
+        if self.idle_timeout is None:
+            return
+
+        expire_before = time() - self.idle_timeout
+        while (self._idle and self._size > self.min_size and
+               self._idle[0][1] < expire_before):
+            connection, _ = self._idle.popleft()
+            self._size -= 1
+            _close_quietly(connection)
+
+
+class PooledConnection(object):
+    """Connection-like facade over :class:`ConnectionPool`.
+
+    Every method call borrows connection from the pool and returns it
+    right after the call, so spaces, indexes and calls bound to this
+    object may be shared between threads.
+
+    """
+    def __init__(self, pool):
+        self.pool = pool
+        self._local = threading.local()
+
+    def __getattr__(self, item):
+        if callable(getattr(Connection, item, None)):
+            return _PooledMethod(self, item)
+
+        with self.borrow() as connection:
+            return getattr(connection, item)
+
+    def space(self, space_name):
+        return Space(self, space_name)
+
+    def close(self):
+        self.pool.close()
+
+    @contextmanager
+    def borrow(self):
+        """Borrow connection unless one is pinned to current thread."""
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            yield pinned
+            return
+
+        with self.pool.connection() as connection:
+            yield connection
+
+    @contextmanager
+    def pinned(self):
+        """Route all calls of current thread to one borrowed connection."""
+        with self.borrow() as connection:
+            previous = getattr(self._local, 'connection', None)
+            self._local.connection = connection
+            try:
+                yield connection
+            finally:
+                self._local.connection = previous
+
+    @contextmanager
+    def pipeline(self, raise_on_error=True):
+        with self.pinned() as connection:
+            with connection.pipeline(raise_on_error) as pipeline:
+                yield pipeline
+
+    @contextmanager
+    def unpipelined(self):
+        with self.pinned() as connection:
+            with connection.unpipelined():
+                yield
+
+
+class _PooledMethod(object):
+    def __init__(self, pooled_connection, name):
+        self.pooled_connection = pooled_connection
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        with self.pooled_connection.borrow() as connection:
+            return getattr(connection, self.name)(*args, **kwargs)
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
 def register_connection(alias, host=None, port=None, **kwargs):
     """Register connection settings for alias.
 
+    Passing ``max_size`` turns alias into pool of connections,
+    see :class:`ConnectionPool` for ``min_size``, ``checkout_timeout``
+    and ``idle_timeout``.
+
     :param alias:
     :param host:
     :param port:
@@ -67,10 +326,15 @@ def disconnect(alias=DEFAULT_ALIAS):
     global _connections
     global _spaces
 
+    _check_owner_pid()
+
     if alias in _connections:
         get_connection(alias=alias).close()
         del _connections[alias]
 
+    if alias in _async_connections:
+        _async_connections.pop(alias).close()
+
     if alias in _spaces:
         del _spaces[alias]
 
@@ -84,38 +348,103 @@ def get_connection(alias=DEFAULT_ALIAS, reconnect=False):
     """
     global _connections
 
+    _check_owner_pid()
+
     if reconnect:
         disconnect(alias)
 
     if alias not in _connections:
         alias_settings = _connection_settings.get(alias)
 
-        if not alias_settings:
-            raise ValueError(
-                'Connection with alias {alias} have not defined.'.format(
-                    alias=alias
-                )
-            )
+        _check_alias_settings(alias, alias_settings)
 
-        try:
-            conn_settings = alias_settings.copy()
-            host = conn_settings.pop('host')
-            port = conn_settings.pop('port')
-            conn_settings.pop('space', None)
-
-            _connections[alias] = Connection(host, port, **conn_settings)
-        except DatabaseError as exc:
-            message = 'Connect error for alias "{alias}": "{message}".'.format(
-                alias=alias, message=exc
-            )
-            raise ConnectionError, message, sys.exc_info()[2]
+        conn_settings, pool_settings = _split_settings(alias_settings)
+
+        def factory():
+            return _open_connection(alias, **conn_settings)
+
+        if 'max_size' in pool_settings:
+            pool = ConnectionPool(factory, **pool_settings)
+            _connections[alias] = PooledConnection(pool)
+        else:
+            _connections[alias] = factory()
 
     return _connections[alias]
 
 
+def get_async_connection(alias=DEFAULT_ALIAS, reconnect=False):
+    """Return :class:`~tarantism.core.AsyncConnection` by alias.
+
+    Single multiplexed connection is shared by all threads of the process
+    regardless of alias pool settings.
+
+    :param alias:
+    :param reconnect:
+
+    """
+    _check_owner_pid()
+
+    if reconnect and alias in _async_connections:
+        _async_connections.pop(alias).close()
+
+    if alias not in _async_connections:
+        alias_settings = _connection_settings.get(alias)
+        _check_alias_settings(alias, alias_settings)
+
+        conn_settings, _ = _split_settings(alias_settings)
+        _async_connections[alias] = _open_connection(
+            alias, connection_class=AsyncConnection, **conn_settings
+        )
+
+    return _async_connections[alias]
+
+
+def get_pool(alias=DEFAULT_ALIAS):
+    """Return connection pool by alias or ``None`` for not pooled alias.
+
+    :param alias:
+
+    """
+    return getattr(get_connection(alias), 'pool', None)
+
+
+def _check_alias_settings(alias, alias_settings):
+    if not alias_settings:
+        raise ValueError(
+            'Connection with alias {alias} have not defined.'.format(
+                alias=alias
+            )
+        )
+
+
+def _split_settings(alias_settings):
+    conn_settings = alias_settings.copy()
+    conn_settings.pop('space', None)
+
+    pool_settings = {}
+    for key in POOL_SETTINGS:
+        if key in conn_settings:
+            pool_settings[key] = conn_settings.pop(key)
+
+    return conn_settings, pool_settings
+
+
+def _open_connection(alias, host, port, connection_class=None, **kwargs):
+    connection_class = connection_class or Connection
+    try:
+        return connection_class(host, port, **kwargs)
+    except DatabaseError as exc:
+        message = 'Connect error for alias "{alias}": "{message}".'.format(
+            alias=alias, message=exc
+        )
+        raise ConnectionError, message, sys.exc_info()[2]
+
+
 def get_space(space, alias=DEFAULT_ALIAS, reconnect=False):
     global _spaces
 
+    _check_owner_pid()
+
     if reconnect:
         disconnect(alias)
 
@@ -128,7 +457,61 @@ def get_space(space, alias=DEFAULT_ALIAS, reconnect=False):
 def connect(alias=DEFAULT_ALIAS, **kwargs):
     global _connections
 
+    _check_owner_pid()
+
     if alias not in _connections:
         register_connection(alias, **kwargs)
 
     return get_connection(alias)
+
+
+def warm_up(*aliases):
+    """Open connections ahead of the first request.
+
+    Pooled aliases are filled up to their ``min_size``.
+
+    :param aliases: aliases to open, all registered aliases by default.
+
+    """
+    for alias in aliases or _connection_settings.keys():
+        pool = get_pool(alias)
+        if pool is not None:
+            pool.fill()
+
+
+def warm_up_after_fork(*aliases):
+    """Call :func:`warm_up` in every multiprocessing worker started later.
+
+    :param aliases: aliases to open, all registered aliases by default.
+
+    """
+    hook = _WarmUpHook(aliases)
+    _warm_up_hooks.append(hook)
+    multiprocessing_util.register_after_fork(hook, _WarmUpHook.run)
+
+
+class _WarmUpHook(object):
+    def __init__(self, aliases):
+        self.aliases = aliases
+
+    def run(self):
+        warm_up(*self.aliases)
+
+
+def _check_owner_pid():
+    """Forget connections inherited from parent process.
+
+    Sockets opened before ``fork()`` are shared with the parent, so child
+    drops them without closing and opens its own on demand.
+
+    """
+    global _owner_pid
+
+    pid = os.getpid()
+    if pid == _owner_pid:
+        return
+
+    _connections.clear()
+    _async_connections.clear()
+    _spaces.clear()
+    _owner_pid = pid
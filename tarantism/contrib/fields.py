@@ -1,14 +1,38 @@
 
 import json
+import threading
+import zlib
 
 import ujson
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 from tarantism.fields import BaseField
 
-__all__ = ['JsonField', 'ProtobufField']
+__all__ = ['JsonField', 'ProtobufField', 'LazyMessage', 'CompressedField']
+
+CODEC_ZLIB = 'zlib'
+
+CODEC_ZSTD = 'zstd'
+
+# Compressed values are stored as marker, codec tag and payload.
+COMPRESSION_MARKER = '\x00'
+
+_CODEC_TAGS = {
+    CODEC_ZLIB: 'z',
+    CODEC_ZSTD: 's',
+}
+
+# Short value which starts with marker itself.
+_RAW_TAG = 'r'
 
 
 class JsonField(BaseField):
+    mutable = True
+
     def __init__(self, *args, **kwargs):
         self.dump_kwargs = kwargs.get('dump_kwargs', {})
         self.load_kwargs = kwargs.get('load_kwargs', {})
@@ -22,17 +46,263 @@ class JsonField(BaseField):
         return ujson.loads(value, **self.load_kwargs)
 
 
+class LazyMessage(object):
+    """Protobuf message parsed from stored bytes on first access.
+
+    Attribute reads and writes go to the parsed message. Serialising
+    message which may not have been changed returns stored bytes as is.
+    Reading scalar field keeps message unchanged, while assigning field,
+    calling mutating method or reading composite or repeated field, which
+    can be changed in place, marks it modified.
+
+    Proxy is not an instance of message class and can't be deep copied or
+    passed to other message's ``CopyFrom``/``MergeFrom``. Use
+    :attr:`message` to get parsed message for that.
+
+    """
+    __slots__ = ('_message_class', '_raw', '_message', '_modified')
+
+    # Methods which never change message.
+    READ_ONLY_METHODS = frozenset([
+        'ByteSize',
+        'FindInitializationErrors',
+        'HasExtension',
+        'HasField',
+        'IsInitialized',
+        'SerializePartialToString',
+        'WhichOneof',
+    ])
+
+    SCALAR_TYPES = (int, long, float, bool, basestring)
+
+    def __init__(self, message_class, raw):
+        object.__setattr__(self, '_message_class', message_class)
+        object.__setattr__(self, '_raw', raw)
+        object.__setattr__(self, '_message', None)
+        object.__setattr__(self, '_modified', False)
+
+    @property
+    def message(self):
+        """Parsed message, assumed to be changed by caller."""
+        object.__setattr__(self, '_modified', True)
+        return self._load()
+
+    @property
+    def modified(self):
+        return self._modified
+
+    def SerializeToString(self):
+        if not self._modified:
+            return self._raw
+
+        return self._message.SerializeToString()
+
+    def CopyFrom(self, other):
+        if isinstance(other, LazyMessage):
+            other = other._load()
+
+        self.message.CopyFrom(other)
+
+    def MergeFrom(self, other):
+        if isinstance(other, LazyMessage):
+            other = other._load()
+
+        self.message.MergeFrom(other)
+
+    def __getattr__(self, name):
+        value = getattr(self._load(), name)
+
+        if name in self.READ_ONLY_METHODS or name == 'DESCRIPTOR':
+            return value
+
+        if value is not None and not isinstance(value, self.SCALAR_TYPES):
+            object.__setattr__(self, '_modified', True)
+
+        return value
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+        object.__setattr__(self, '_modified', True)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyMessage):
+            other = other._load()
+
+        return self._load() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr(self._load())
+
+    def __str__(self):
+        return str(self._load())
+
+    def _load(self):
+        message = self._message
+        if message is None:
+            message = self._message_class()
+            message.ParseFromString(self._raw)
+            object.__setattr__(self, '_message', message)
+
+        return message
+
+
 class ProtobufField(BaseField):
+    """Protobuf message stored serialised.
+
+    With ``lazy=True`` loaded values are :class:`LazyMessage` proxies, so
+    rows are not parsed until the message is read and unchanged messages
+    are saved back without serialising.
+
+    """
+    mutable = True
+
     def __init__(self, message_class, *args, **kwargs):
         self.message_class = message_class
+        self.lazy = kwargs.pop('lazy', False)
 
         super(ProtobufField, self).__init__(*args, **kwargs)
 
     def to_db(self, value):
+        if value is None:
+            return value
+
         return value.SerializeToString()
 
     def to_python(self, value):
+        if value is None:
+            return value
+
+        if self.lazy:
+            return LazyMessage(self.message_class, value)
+
         message = self.message_class()
         message.ParseFromString(value)
 
         return message
+
+
+class CompressedField(BaseField):
+    """Wrapper compressing serialised value of another field.
+
+    >>> data = CompressedField(JsonField(), codec='zlib', threshold=512)
+
+    Values serialised to ``threshold`` bytes or more are compressed and
+    stored with two bytes header, shorter ones and ones compression does
+    not shrink are stored as is. Values without header are passed to
+    wrapped field unchanged, so existing field can be wrapped without
+    migration as long as its stored values never start with zero byte.
+
+    :param codec: ``'zlib'`` or ``'zstd'``, the latter requires
+        ``zstandard`` package.
+    :param level: compression level, codec default if None.
+    :param dictionary: pre-trained zstd dictionary bytes, makes small
+        documents compress well. Values compressed with dictionary can not
+        be read without it.
+
+    """
+    def __init__(self,
+                 field,
+                 codec=CODEC_ZLIB,
+                 threshold=512,
+                 level=None,
+                 dictionary=None,
+                 **kwargs):
+        if codec not in _CODEC_TAGS:
+            raise ValueError('Unknown compression codec {codec}.'.format(
+                codec=codec
+            ))
+
+        if codec == CODEC_ZSTD and zstandard is None:
+            raise ImportError('zstandard package is required for zstd codec.')
+
+        if dictionary is not None and codec != CODEC_ZSTD:
+            raise ValueError('Compression dictionary requires zstd codec.')
+
+        self.field = field
+        BaseField.creation_counter -= 1
+
+        self.codec = codec
+        self.threshold = threshold
+        self.level = level
+        self.dictionary = dictionary
+        self.mutable = field.mutable
+
+        self._tag = _CODEC_TAGS[codec]
+        self._zstd_dict = None
+        if dictionary is not None:
+            self._zstd_dict = zstandard.ZstdCompressionDict(dictionary)
+        # zstd contexts are reused but can not be shared between threads.
+        self._local = threading.local()
+
+        kwargs.setdefault('required', field.required)
+        kwargs.setdefault('default', field.default)
+        super(CompressedField, self).__init__(**kwargs)
+
+    def to_db(self, value):
+        data = self.field.to_db(value)
+        if not isinstance(data, basestring):
+            return data
+
+        if len(data) >= self.threshold:
+            if isinstance(data, unicode):
+                data = data.encode('utf8')
+
+            compressed = self._compress(data)
+            if len(compressed) + 2 < len(data):
+                return COMPRESSION_MARKER + self._tag + compressed
+
+        if data.startswith(COMPRESSION_MARKER):
+            return COMPRESSION_MARKER + _RAW_TAG + data
+
+        return data
+
+    def to_python(self, value):
+        if isinstance(value, str) and value.startswith(COMPRESSION_MARKER):
+            value = self._decompress(value[1:2], value[2:])
+
+        return self.field.to_python(value)
+
+    def validate(self, value):
+        self.field.validate(value)
+
+    def _compress(self, data):
+        if self.codec == CODEC_ZLIB:
+            return zlib.compress(data, 6 if self.level is None else self.level)
+
+        compressor = getattr(self._local, 'compressor', None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(
+                level=3 if self.level is None else self.level,
+                dict_data=self._zstd_dict
+            )
+
+        return compressor.compress(data)
+
+    def _decompress(self, tag, data):
+        if tag == _RAW_TAG:
+            return data
+
+        if tag == _CODEC_TAGS[CODEC_ZLIB]:
+            return zlib.decompress(data)
+
+        if tag == _CODEC_TAGS[CODEC_ZSTD]:
+            if zstandard is None:
+                raise ImportError(
+                    'zstandard package is required to read {name} field.'.format(
+                        name=self.name
+                    ))
+
+            decompressor = getattr(self._local, 'decompressor', None)
+            if decompressor is None:
+                decompressor = self._local.decompressor = zstandard.ZstdDecompressor(
+                    dict_data=self._zstd_dict
+                )
+
+            return decompressor.decompress(data)
+
+        raise ValueError('{name} field error: unknown compression tag {tag!r}.'.format(
+            name=self.name, tag=tag
+        ))
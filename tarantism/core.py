@@ -1,6 +1,130 @@
-from tarantool import space, connection
+import itertools
+import socket
+import threading
+from contextlib import contextmanager
+from time import time
 
-from tarantism.exceptions import parse_tarantool_exception
+import msgpack
+import six
+from tarantool import schema, space, connection
+from tarantool.const import IPROTO_SYNC, ITERATOR_ALL, ITERATOR_EQ
+from tarantool.error import DatabaseError, NetworkError, SchemaReloadException
+from tarantool.request import (
+    RequestCall,
+    RequestDelete,
+    RequestEval,
+    RequestInsert,
+    RequestReplace,
+    RequestSelect,
+    RequestUpdate,
+    RequestUpsert,
+)
+from tarantool.response import Response
+from tarantool.utils import check_key
+
+from tarantism.exceptions import (
+    PipelineDiscarded, PipelineError, TimeoutError, parse_tarantool_exception
+)
+
+__all__ = [
+    'Call', 'Index', 'Space', 'Schema', 'Connection', 'AsyncConnection',
+    'Future', 'Pipeline',
+]
+
+
+SELECT_LIMIT_MAX = 0xffffffff
+
+
+class Future(object):
+    """Result of request which is still in flight.
+
+    :param waiter: callable ``waiter(future, timeout)`` which drives IO
+        until the future is resolved.
+    :param canceller: callable ``canceller(future)`` which forgets the
+        request when future is cancelled.
+
+    """
+    def __init__(self, waiter=None, canceller=None):
+        self._waiter = waiter
+        self._canceller = canceller
+        self._done = False
+        self._result = None
+        self._exception = None
+
+    def done(self):
+        return self._done
+
+    def result(self, timeout=None):
+        if not self._done and self._waiter is not None:
+            self._waiter(self, timeout)
+
+        if not self._done:
+            raise TimeoutError('Request timed out.')
+
+        if self._exception is not None:
+            raise self._exception
+
+        return self._result
+
+    def exception(self, timeout=None):
+        """Return exception the request failed with or ``None``."""
+        try:
+            self.result(timeout)
+        except Exception:
+            if not self._done:
+                raise
+
+        return self._exception
+
+    def cancel(self):
+        """Stop waiting for response, False if it is already received."""
+        if self._done:
+            return False
+
+        if self._canceller is not None:
+            self._canceller(self)
+        self.set_exception(NetworkError('Request cancelled.'))
+
+        return True
+
+    def set_result(self, result):
+        self._result = result
+        self._done = True
+
+    def set_exception(self, exception):
+        self._exception = exception
+        self._done = True
+
+    def then(self, callback):
+        """Return future resolved with ``callback(result)``."""
+        return _ChainedFuture(self, callback)
+
+
+class _ChainedFuture(Future):
+    def __init__(self, parent, callback):
+        super(_ChainedFuture, self).__init__(
+            waiter=self._wait_parent, canceller=lambda future: parent.cancel()
+        )
+        self._parent = parent
+        self._callback = callback
+
+    def done(self):
+        return self._done or self._parent.done()
+
+    def _wait_parent(self, future, timeout):
+        try:
+            result = self._parent.result(timeout)
+        except NetworkError:
+            if not self._parent.done():
+                return
+            raise
+        except Exception as e:
+            self.set_exception(e)
+        else:
+            try:
+                self.set_result(self._callback(result))
+            except Exception as e:
+                self.set_exception(e)
 
 
 class Call(object):
@@ -33,7 +157,8 @@ class Index(object):
 class Space(space.Space):
     def __init__(self, connection, space_name):
         self.name = space_name
-        super(Space, self).__init__(connection, space_name)
+        self.connection = connection
+        self.space_no = connection.space_no(space_name)
 
     def __getattr__(self, item):
         return Call(self.connection, 'box.space.%s:%s' % (self.name, item))
@@ -44,15 +169,474 @@ class Space(space.Space):
     def call(self, *args, **kwargs):
         return self.connection.call(*args, **kwargs)
 
+    def select(self, *args, **kwargs):
+        # Rows are needed right away, so select is not queued by pipeline.
+        with self.connection.unpipelined():
+            return super(Space, self).select(*args, **kwargs)
+
+
+class Pipeline(object):
+    """Queue of requests written to the socket in one batch.
+
+    Every queued request immediately gets :class:`Future` which is
+    resolved by :meth:`execute`. Responses are read back in order and
+    failed requests do not affect the others.
+
+    :param raise_on_error: raise :class:`~tarantism.exceptions.PipelineError`
+        from :meth:`execute` if some requests failed. Changing it affects
+        requests submitted afterwards.
+
+    """
+    def __init__(self, connection, raise_on_error=True):
+        self.connection = connection
+        self.raise_on_error = raise_on_error
+        self.futures = []
+        self._requests = []
+        self._raise_flags = []
+
+    def __len__(self):
+        return len(self._requests)
+
+    def submit(self, method, *args, **kwargs):
+        request = self.connection.prepare(method, *args, **kwargs)
+        future = Future(self._wait)
+
+        self._requests.append(request)
+        self.futures.append(future)
+        self._raise_flags.append(self.raise_on_error)
+
+        return future
+
+    @property
+    def errors(self):
+        """List of ``(position, exception)`` for failed requests."""
+        return [
+            (position, future._exception)
+            for position, future in enumerate(self.futures)
+            if future.done() and future._exception is not None
+        ]
+
+    def execute(self):
+        """Send queued requests and read responses.
+
+        :returns: list of futures of all requests made through pipeline.
+
+        """
+        self._flush()
+
+        errors = [
+            (position, exception) for position, exception in self.errors
+            if self._raise_flags[position]
+        ]
+        if errors:
+            raise PipelineError(errors)
+
+        return self.futures
+
+    def discard(self):
+        """Drop queued requests, their futures fail with
+        :class:`~tarantism.exceptions.PipelineDiscarded`."""
+        requests, self._requests = self._requests, []
+        for future in self.futures[len(self.futures) - len(requests):]:
+            future.set_exception(PipelineDiscarded(
+                'Request was not sent, pipeline block raised.'
+            ))
+
+    def _flush(self):
+        requests, self._requests = self._requests, []
+        if requests:
+            futures = self.futures[len(self.futures) - len(requests):]
+            self.connection._execute_pipeline(requests, futures)
+
+    def _wait(self, future, timeout):
+        # Result requested inside the block, send what is queued so far.
+        self._flush()
+
+
+class Schema(schema.Schema):
+    """Schema which is fetched directly even while pipeline is active."""
+    def fetch_space_from(self, space):
+        with self.con.unpipelined():
+            return super(Schema, self).fetch_space_from(space)
+
+    def fetch_index_from(self, space, index):
+        with self.con.unpipelined():
+            return super(Schema, self).fetch_index_from(space, index)
+
+
+def _pipelined(method_name):
+    """Wrap driver method to queue request while pipeline is active."""
+    method = getattr(connection.Connection, method_name)
+
+    def pipelined(self, *args, **kwargs):
+        if self._pipeline is not None:
+            return self._pipeline.submit(method_name, *args, **kwargs)
+        return method(self, *args, **kwargs)
+
+    pipelined.__name__ = method_name
+    pipelined.__doc__ = method.__doc__
+
+    return pipelined
+
 
 class Connection(connection.Connection):
+    def __init__(self, *args, **kwargs):
+        self._sync = itertools.count(1)
+        self._pipeline = None
+
+        connect_now = kwargs.pop('connect_now', True)
+        super(Connection, self).__init__(*args, connect_now=False, **kwargs)
+
+        self.schema = Schema(self)
+        if connect_now:
+            self.connect()
+
+    @contextmanager
+    def pipeline(self, raise_on_error=True):
+        """Queue requests made inside the block and send them in one batch.
+
+        Driver methods called inside the block return
+        :class:`Future` instead of response, :meth:`Space.select` used
+        by models and querysets is sent directly. If the block raises
+        nothing is sent and futures fail with
+        :class:`~tarantism.exceptions.PipelineDiscarded`.
+
+        >>> with connection.pipeline() as pipeline:
+        ...     connection.insert('card', values)
+        ...     connection.insert('card_data', data_values)
+        >>> pipeline.errors
+        []
+
+        """
+        if self._pipeline is not None:
+            # Nested block joins outer batch, outer block raises errors
+            # of requests made here only if this block asked for it.
+            pipeline = self._pipeline
+            outer_raise_on_error = pipeline.raise_on_error
+            pipeline.raise_on_error = raise_on_error
+            try:
+                yield pipeline
+            finally:
+                pipeline.raise_on_error = outer_raise_on_error
+            return
+
+        self._pipeline = Pipeline(self, raise_on_error=raise_on_error)
+        try:
+            yield self._pipeline
+        except BaseException:
+            pipeline, self._pipeline = self._pipeline, None
+            pipeline.discard()
+            raise
+
+        pipeline, self._pipeline = self._pipeline, None
+        pipeline.execute()
+
+    @contextmanager
+    def unpipelined(self):
+        pipeline, self._pipeline = self._pipeline, None
+        try:
+            yield
+        finally:
+            self._pipeline = pipeline
+
     def space(self, space_name):
         return Space(self, space_name)
 
+    def space_no(self, space_name):
+        return self.schema.get_space(space_name).sid
+
+    def index_no(self, space_name, index_name):
+        return self.schema.get_index(space_name, index_name).iid
+
+    def generate_sync(self):
+        return next(self._sync)
+
+    insert = _pipelined('insert')
+    replace = _pipelined('replace')
+    delete = _pipelined('delete')
+    update = _pipelined('update')
+    upsert = _pipelined('upsert')
+    select = _pipelined('select')
+    eval = _pipelined('eval')
+
     def call(self, func_name, *args):
+        if self._pipeline is not None:
+            return self._pipeline.submit('call', func_name, *args)
+
         try:
             return super(Connection, self).call(func_name, *args)
         except Connection.DatabaseError as e:
             raise parse_tarantool_exception(e)
 
+    def prepare(self, method, *args, **kwargs):
+        """Build request for driver method without sending it.
+
+        Space and index names are resolved through the schema right away,
+        so prepared requests may be written to the socket in any order.
+
+        """
+        try:
+            prepare = getattr(self, '_prepare_' + method)
+        except AttributeError:
+            raise ValueError('Unknown request method {method}.'.format(
+                method=method
+            ))
+
+        return prepare(*args, **kwargs)
+
+    def _space_id(self, space_name):
+        if isinstance(space_name, six.string_types):
+            return self.space_no(space_name)
+        return space_name
+
+    def _index_id(self, space_no, index_name):
+        if isinstance(index_name, six.string_types):
+            return self.index_no(space_no, index_name)
+        return index_name
+
+    def _prepare_insert(self, space_name, values):
+        return RequestInsert(self, self._space_id(space_name), values)
+
+    def _prepare_replace(self, space_name, values):
+        return RequestReplace(self, self._space_id(space_name), values)
+
+    def _prepare_delete(self, space_name, key, index=0):
+        space_no = self._space_id(space_name)
+        return RequestDelete(
+            self, space_no, self._index_id(space_no, index), check_key(key)
+        )
+
+    def _prepare_update(self, space_name, key, op_list, index=0):
+        space_no = self._space_id(space_name)
+        return RequestUpdate(
+            self, space_no, self._index_id(space_no, index),
+            check_key(key), op_list
+        )
+
+    def _prepare_upsert(self, space_name, tuple_value, op_list, index=0):
+        space_no = self._space_id(space_name)
+        return RequestUpsert(
+            self, space_no, self._index_id(space_no, index),
+            tuple_value, op_list
+        )
+
+    def _prepare_select(self, space_name, key=None, offset=0,
+                        limit=SELECT_LIMIT_MAX, index=0, iterator=None,
+                        **kwargs):
+        if iterator is None:
+            iterator = ITERATOR_EQ
+            if key is None or (isinstance(key, (list, tuple)) and not key):
+                iterator = ITERATOR_ALL
+
+        space_no = self._space_id(space_name)
+        return RequestSelect(
+            self, space_no, self._index_id(space_no, index),
+            check_key(key, select=True), offset, limit, iterator
+        )
+
+    def _prepare_call(self, func_name, *args):
+        if len(args) == 1 and isinstance(args[0], (list, tuple)):
+            args = args[0]
+        return RequestCall(self, func_name, args)
+
+    def _prepare_eval(self, expr, *args):
+        if len(args) == 1 and isinstance(args[0], (list, tuple)):
+            args = args[0]
+        return RequestEval(self, expr, args)
+
+    def _execute_pipeline(self, requests, futures):
+        self._opt_reconnect()
+
+        try:
+            self._socket.sendall(b''.join(bytes(r) for r in requests))
+
+            for future in futures:
+                _, response, exception = self._parse_response(
+                    self._read_response()
+                )
+                if exception is not None:
+                    future.set_exception(exception)
+                else:
+                    future.set_result(response)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+
+    def _parse_response(self, packet):
+        """Return ``(sync, response, exception)`` for raw response packet."""
+        unpacker = msgpack.Unpacker(use_list=True)
+        unpacker.feed(packet)
+        sync = unpacker.unpack().get(IPROTO_SYNC, 0)
+
+        try:
+            return sync, Response(self, packet), None
+        except DatabaseError as e:
+            return sync, None, parse_tarantool_exception(e)
+
+
+class AsyncConnection(Connection):
+    """Connection which keeps many requests in flight over one socket.
+
+    :meth:`submit` writes request and returns :class:`Future` at once,
+    responses are matched to requests by sync id. Whichever thread waits
+    for its future reads the socket and resolves futures of other
+    threads on the way, so no background thread is needed.
+
+    """
+    def __init__(self, *args, **kwargs):
+        self._local = threading.local()
+        self._pending = {}
+        self._write_lock = threading.Lock()
+        self._read_condition = threading.Condition(threading.Lock())
+        self._reading = False
+        super(AsyncConnection, self).__init__(*args, **kwargs)
+
+    @property
+    def _pipeline(self):
+        # Connection is shared by threads, pipeline is kept per thread.
+        return getattr(self._local, 'pipeline', None)
+
+    @_pipeline.setter
+    def _pipeline(self, pipeline):
+        self._local.pipeline = pipeline
+
+    def submit(self, method, *args, **kwargs):
+        """Send request for driver method, return :class:`Future`.
+
+        >>> future = connection.submit('select', 'card', card_id)
+        >>> response = future.result()
+
+        """
+        return self.send_request_async(self.prepare(method, *args, **kwargs))
+
+    def send_request_async(self, request):
+        future = Future(self._wait, self._forget)
+
+        with self._write_lock:
+            if not self._pending:
+                self._opt_reconnect()
+
+            packet = bytes(request)
+            future._sync = request.sync
+            self._pending[request.sync] = future
+            try:
+                self._socket.sendall(packet)
+            except Exception as e:
+                del self._pending[request.sync]
+                raise NetworkError(e)
+
+        return future
+
+    def _execute_pipeline(self, requests, futures):
+        with self._write_lock:
+            if not self._pending:
+                self._opt_reconnect()
+
+            packets = []
+            for request, future in zip(requests, futures):
+                packets.append(bytes(request))
+                future._waiter = self._wait
+                future._canceller = self._forget
+                future._sync = request.sync
+                self._pending[request.sync] = future
+
+            try:
+                self._socket.sendall(b''.join(packets))
+            except Exception as e:
+                for request in requests:
+                    self._pending.pop(request.sync, None)
+                raise NetworkError(e)
+
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                pass
+
+    def _send_request(self, request):
+        while True:
+            try:
+                return self.send_request_async(request).result()
+            except SchemaReloadException as e:
+                self.update_schema(e.schema_version)
+
+    def _wait(self, future, timeout=None):
+        deadline = None if timeout is None else time() + timeout
+
+        with self._read_condition:
+            while not future.done():
+                if not self._reading:
+                    self._reading = True
+                    break
+
+                remaining = None if deadline is None else deadline - time()
+                if remaining is not None and remaining <= 0:
+                    # Late response is skipped by reader.
+                    self._pending.pop(future._sync, None)
+                    future.set_exception(TimeoutError('Request timed out.'))
+                    return
+
+                self._read_condition.wait(remaining)
+            else:
+                return
+
+        try:
+            while not future.done():
+                if deadline is not None:
+                    self._wait_readable(deadline)
+                packet = self._read_response()
+                sync, response, exception = self._parse_response(packet)
+
+                with self._read_condition:
+                    pending = self._pending.pop(sync, None)
+                    if pending is not None:
+                        if exception is not None:
+                            pending.set_exception(exception)
+                        else:
+                            pending.set_result(response)
+                    self._read_condition.notify_all()
+        except TimeoutError as e:
+            # Nothing is read yet, so other requests stay in flight.
+            self._forget(future)
+            future.set_exception(e)
+        except NetworkError as e:
+            self._fail_pending(e)
+            raise
+        finally:
+            with self._read_condition:
+                self._reading = False
+                self._read_condition.notify_all()
+
+    def _wait_readable(self, deadline):
+        """Wait for next response to arrive until ``deadline``."""
+        remaining = deadline - time()
+        if remaining <= 0:
+            raise TimeoutError('Request timed out.')
+
+        sock = self._socket
+        socket_timeout = sock.gettimeout()
+        sock.settimeout(remaining)
+        try:
+            # Peek, so partial packet is never consumed on timeout.
+            sock.recv(1, socket.MSG_PEEK)
+        except socket.timeout:
+            raise TimeoutError('Request timed out.')
+        except socket.error as e:
+            raise NetworkError(e)
+        finally:
+            sock.settimeout(socket_timeout)
+
+    def _forget(self, future):
+        with self._read_condition:
+            self._pending.pop(future._sync, None)
+
+    def _fail_pending(self, exception):
+        with self._read_condition:
+            pending, self._pending = self._pending, {}
+            for future in pending.itervalues():
+                future.set_exception(exception)
+            self._read_condition.notify_all()
+
 
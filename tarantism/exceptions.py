@@ -1,10 +1,15 @@
 from tarantool import DatabaseError
+from tarantool import NetworkError
 
 __all__ = [
     'DoesNotExist',
     'MultipleObjectsReturned',
     'ValidationError',
-    'FieldError'
+    'FieldError',
+    'PipelineError',
+    'PipelineDiscarded',
+    'TimeoutError',
+    'WriteBufferFull',
 ]
 
 
@@ -24,6 +29,35 @@ class FieldError(Exception):
     pass
 
 
+class PipelineError(Exception):
+    """Some of pipelined requests failed.
+
+    :ivar errors: list of ``(position, exception)`` pairs.
+
+    """
+    def __init__(self, errors):
+        self.errors = errors
+        super(PipelineError, self).__init__(
+            '{count} pipelined requests failed, first error: {error!r}'.format(
+                count=len(errors), error=errors[0][1]
+            )
+        )
+
+
+class PipelineDiscarded(Exception):
+    """Request was queued by pipeline block which raised, it was not sent."""
+    pass
+
+
+class TimeoutError(NetworkError):
+    """Response did not arrive in time, like ``concurrent.futures`` one."""
+    pass
+
+
+class WriteBufferFull(Exception):
+    pass
+
+
 class IgnorableErrorMixin(object):
     pass
 
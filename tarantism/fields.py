@@ -1,7 +1,9 @@
 import re
-from datetime import datetime
+from copy import deepcopy
+from binascii import hexlify, unhexlify
+from datetime import datetime, timedelta
 from decimal import Decimal
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 import ujson
 
@@ -12,7 +14,8 @@ __all__ = [
     'INT32_MIN', 'INT32_MAX', 'Num32Field',
     'INT64_MIN', 'INT64_MAX', 'Num64Field',
     'StringField', 'BytesField',
-    'DateTimeField', 'DEFAULT_DATETIME_FORMAT',
+    'DateTimeField', 'DEFAULT_DATETIME_FORMAT', 'DATETIME_STORAGE_STRING',
+    'DATETIME_STORAGE_EPOCH_MS', 'DATETIME_STORAGE_EPOCH_US',
     'DecimalField',
 ]
 
@@ -35,6 +38,10 @@ class BaseField(object):
     tarantool_filter_type = str
     tarantool_index_type = 'scalar'
 
+    # Values of mutable fields can change in place, so stored form of such
+    # field is remembered when read and compared by Model.save().
+    mutable = False
+
     def __init__(self,
                  required=False,
                  default=None,
@@ -56,15 +63,55 @@ class BaseField(object):
         if instance is None:
             return self
 
-        return instance._data.get(self.name)
+        value = instance._data.get(self.name)
+        if self.mutable:
+            self.snapshot(instance, value)
+
+        return value
 
     def __set__(self, instance, value):
+        instance._data[self.name] = self.default_value(value)
+        instance._dirty.add(self.name)
+
+    def snapshot(self, instance, value, index=None):
+        """Remember stored form of value read from loaded model.
+
+        Value may be changed in place after it is read, :meth:`Model.save`
+        saves it only if its stored form differs from the snapshot. Column
+        of the row model was decoded from is used as is if it is a string,
+        which decoded value can't share, so reading does not encode.
+
+        """
+        if not instance._exists_in_db or self.name in instance._dirty:
+            return
+
+        snapshots = getattr(instance, '_snapshots', None)
+        if snapshots is None:
+            snapshots = instance._snapshots = {}
+
+        if self.name in snapshots:
+            return
+
+        stored = None
+        raw = getattr(instance, '_raw', None)
+        if raw is not None:
+            if index is None:
+                index = instance._fields_ordered.index(self.name)
+            if index < len(raw):
+                stored = raw[index]
+
+        if not isinstance(stored, basestring):
+            stored = deepcopy(self.to_db(value))
+
+        snapshots[self.name] = stored
+
+    def default_value(self, value):
         if value is None and self.default is not None:
             value = self.default
             if callable(value):
                 value = value()
 
-        instance._data[self.name] = value
+        return value
 
     def to_python(self, value):
         return value
@@ -220,11 +267,22 @@ class StringField(BytesField):
 
 
 class UUIDField(StringField):
+    """UUID stored as 36 characters string or 16 raw bytes.
+
+    :param binary: store 16 bytes, which halves key size. Values are
+        loaded as canonical strings either way, :class:`uuid.UUID`
+        and 36 characters strings are accepted for saving and lookups.
+        Strings stored before are loaded too, but lookups find them
+        only after :func:`~tarantism.migrations.migrate_uuid_to_binary`.
+
+    """
     @staticmethod
     def str_uuid():
         return str(uuid4())
 
-    def __init__(self, **kwargs):
+    def __init__(self, binary=False, **kwargs):
+        self.binary = binary
+
         kwargs.update(
             default=UUIDField.str_uuid,
             max_length=36,
@@ -233,26 +291,128 @@ class UUIDField(StringField):
 
         super(UUIDField, self).__init__(**kwargs)
 
+    def to_db(self, value):
+        if not self.binary:
+            if isinstance(value, UUID):
+                value = str(value)
+            return super(UUIDField, self).to_db(value)
+
+        if not value:
+            return value
+
+        if isinstance(value, UUID):
+            return value.bytes
+
+        if len(value) == 16:
+            return value
+
+        return unhexlify(value.replace('-', ''))
+
+    def to_python(self, value):
+        if not self.binary:
+            return super(UUIDField, self).to_python(value)
+
+        if not value:
+            return value
+
+        if isinstance(value, UUID):
+            return str(value)
+
+        if len(value) != 16:
+            # Stored as string before binary storage was enabled.
+            return str(UUID(value))
+
+        value = hexlify(value)
+        return '-'.join((
+            value[:8], value[8:12], value[12:16], value[16:20], value[20:]
+        ))
+
+    def validate(self, value):
+        if isinstance(value, UUID):
+            value = str(value)
+
+        super(UUIDField, self).validate(value)
+
 
 DEFAULT_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
 
+DATETIME_STORAGE_STRING = 'string'
+
+DATETIME_STORAGE_EPOCH_MS = 'epoch_ms'
+
+DATETIME_STORAGE_EPOCH_US = 'epoch_us'
+
+EPOCH = datetime(1970, 1, 1)
+
+# Microseconds in storage unit.
+DATETIME_EPOCH_UNITS = {
+    DATETIME_STORAGE_EPOCH_MS: 1000,
+    DATETIME_STORAGE_EPOCH_US: 1,
+}
+
 
 class DateTimeField(BaseField):
+    """Datetime stored as formatted string or integer since epoch.
+
+    :param storage: ``'string'`` formats value with ``datetime_format``,
+        ``'epoch_ms'``/``'epoch_us'`` store milliseconds/microseconds
+        since 1970-01-01 as unsigned integer, which is faster to convert
+        and compare. Naive values are taken as UTC, aware ones are
+        converted to UTC and loaded back naive. Strings stored before
+        are parsed with ``datetime_format`` until migrated.
+
+    """
     tarantool_index_type = 'string'
 
     def __init__(self,
                  datetime_format=DEFAULT_DATETIME_FORMAT,
+                 storage=DATETIME_STORAGE_STRING,
                  **kwargs):
+        if storage != DATETIME_STORAGE_STRING and storage not in DATETIME_EPOCH_UNITS:
+            raise ValueError('Unknown datetime storage {storage}.'.format(
+                storage=storage
+            ))
+
         self.datetime_format = datetime_format
+        self.storage = storage
+        self.epoch_unit = DATETIME_EPOCH_UNITS.get(storage)
+
+        if self.epoch_unit is not None:
+            self.tarantool_filter_type = long
+            self.tarantool_index_type = 'unsigned'
 
         super(DateTimeField, self).__init__(**kwargs)
 
     def to_db(self, value):
+        if self.epoch_unit is not None:
+            if not value:
+                return None
+
+            if value.tzinfo is not None:
+                value = value.replace(tzinfo=None) - value.utcoffset()
+
+            delta = value - EPOCH
+            microseconds = (
+                (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+            )
+            return microseconds // self.epoch_unit
+
         if value:
             return value.strftime(self.datetime_format)
         return ''
 
     def to_python(self, value):
+        if self.epoch_unit is not None:
+            if isinstance(value, basestring):
+                # Stored as string before epoch storage was enabled, see
+                # tarantism.migrations.migrate_datetime_to_epoch().
+                if not value:
+                    return None
+                return datetime.strptime(value, self.datetime_format)
+            if value is None:
+                return None
+            return EPOCH + timedelta(microseconds=value * self.epoch_unit)
+
         if value:
             return datetime.strptime(value, self.datetime_format)
         return None
@@ -268,6 +428,14 @@ class DateTimeField(BaseField):
                 )
             )
 
+        if self.epoch_unit is not None and self.to_db(value) < 0:
+            raise ValidationError(
+                '{name} field error: '
+                '{value} is earlier than epoch.'.format(
+                    name=self.name, value=value
+                )
+            )
+
 
 class DecimalField(BaseField):
     def __init__(self, **kwargs):
@@ -295,6 +463,8 @@ class BooleanField(BaseField):
 
 
 class JsonField(BaseField):
+    mutable = True
+
     def to_db(self, value):
         return ujson.dumps(value)
 
@@ -313,7 +483,40 @@ class JsonField(BaseField):
             )
 
 
+class MsgpackField(BaseField):
+    """Dict or list stored as native msgpack structure.
+
+    Unlike :class:`JsonField` value is not serialised to JSON text, the
+    driver packs it along with the tuple, so loading skips JSON parsing
+    and server can look inside the document. JSON text stored by
+    :class:`JsonField` before is parsed on load.
+
+    """
+    mutable = True
+
+    def to_db(self, value):
+        return value
+
+    def to_python(self, value):
+        if isinstance(value, basestring):
+            return ujson.loads(value)
+        return value
+
+    def validate(self, value):
+        super(MsgpackField, self).validate(value)
+
+        if not isinstance(value, (dict, list, tuple)):
+            raise ValidationError(
+                '{name} field error: '
+                'value is not dict/list. Use simple field'.format(
+                    name=self.name
+                )
+            )
+
+
 class DictField(BaseField):
+    mutable = True
+
     def __init__(self, **kwargs):
         kwargs.setdefault('default', lambda: {})
         super(DictField, self).__init__(**kwargs)
@@ -331,6 +534,8 @@ class DictField(BaseField):
 
 
 class ListField(BaseField):
+    mutable = True
+
     def __init__(self, field, **kwargs):
         self.field = field
         BaseField.creation_counter -= 1
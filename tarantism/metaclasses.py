@@ -1,4 +1,6 @@
 
+from tarantism.cache import ModelCache
+from tarantism.codec import compile_codec
 from tarantism.fields import BaseField
 from tarantism.queryset import QuerySetManager
 from tarantism.exceptions import DoesNotExist
@@ -29,10 +31,160 @@ class ModelMetaclass(type):
                                          for v in fields.itervalues()))
 
         attrs['_objects'] = QuerySetManager()
+        attrs['_index_cache'] = None
+        attrs['_write_buffer'] = None
 
         attrs['_meta'] = attrs.pop('meta') if 'meta' in attrs else {}
 
+        # Name of the field primary index consists of, if single.
+        primary_fields = [f.name for f in fields.itervalues() if f.db_index == 0]
+        attrs['_primary_field'] = (
+            primary_fields[0] if len(primary_fields) == 1 else None
+        )
+
+        attrs['_cache'] = None
+        if attrs['_meta'].get('cache'):
+            if attrs['_primary_field'] is None:
+                raise ValueError(
+                    '{name} model cache requires single field primary key.'.format(
+                        name=name
+                    ))
+            attrs['_cache'] = ModelCache(**attrs['_meta']['cache'])
+
+        if attrs['_meta'].get('compact') and attrs['_meta'].get('lazy'):
+            raise ValueError(
+                '{name} model can not be both compact and lazy.'.format(
+                    name=name
+                ))
+
+        if attrs['_meta'].get('compact'):
+            _make_compact(attrs)
+
+        if attrs['_meta'].get('lazy'):
+            _make_lazy(attrs)
+
         for exc in (DoesNotExist, MultipleObjectsReturned):
             attrs[exc.__name__] = exc
 
-        return super_new(cls, name, bases, attrs)
+        new_class = super_new(cls, name, bases, attrs)
+
+        decode, encode = compile_codec(new_class)
+        new_class._decode = staticmethod(decode)
+        new_class._encode = encode
+
+        return new_class
+
+
+class CompactFieldDescriptor(object):
+    """Access field of compact model by position in ``_values`` list."""
+    __slots__ = ('field', 'index', 'name', 'mutable')
+
+    def __init__(self, field, index):
+        self.field = field
+        self.index = index
+        self.name = field.name
+        self.mutable = field.mutable
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.field
+
+        value = instance._values[self.index]
+        if self.mutable:
+            self.field.snapshot(instance, value, self.index)
+
+        return value
+
+    def __set__(self, instance, value):
+        instance._values[self.index] = self.field.default_value(value)
+        instance._dirty.add(self.name)
+
+
+def _make_compact(attrs):
+    """Store field values of model instances in list without ``__dict__``.
+
+    Values are laid out in ``_fields_ordered`` order, ``_data`` becomes
+    property building dict from them.
+
+    """
+    attrs['__slots__'] = (
+        '_values', '_exists_in_db', '_dirty', '_deferred', '_snapshots',
+        '_raw',
+    )
+
+    for index, field_name in enumerate(attrs['_fields_ordered']):
+        attrs[field_name] = CompactFieldDescriptor(
+            attrs['_fields'][field_name], index
+        )
+
+    fields_ordered = attrs['_fields_ordered']
+
+    def get_data(self):
+        return dict(zip(fields_ordered, self._values))
+
+    def set_data(self, data):
+        self._values = [data.get(field_name) for field_name in fields_ordered]
+
+    attrs['_data'] = property(get_data, set_data)
+
+
+class LazyFieldDescriptor(object):
+    """Decode field of lazy model from raw tuple on first access."""
+    __slots__ = ('field', 'index', 'name', 'mutable')
+
+    def __init__(self, field, index):
+        self.field = field
+        self.index = index
+        self.name = field.name
+        self.mutable = field.mutable
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.field
+
+        value = self.load(instance)
+        if self.mutable:
+            self.field.snapshot(instance, value, self.index)
+
+        return value
+
+    def load(self, instance):
+        decoded = instance._decoded
+        if self.name not in decoded:
+            value = None
+            raw = instance._raw
+            if raw is not None and self.index < len(raw):
+                value = self.field.to_python(raw[self.index])
+            decoded[self.name] = self.field.default_value(value)
+
+        return decoded[self.name]
+
+    def __set__(self, instance, value):
+        instance._decoded[self.name] = self.field.default_value(value)
+        instance._dirty.add(self.name)
+
+
+def _make_lazy(attrs):
+    """Keep raw tuple in model instances and decode fields when read.
+
+    Decoded values are memoised in ``_decoded``, ``_data`` becomes
+    property decoding all remaining fields.
+
+    """
+    descriptors = []
+    for index, field_name in enumerate(attrs['_fields_ordered']):
+        descriptor = LazyFieldDescriptor(attrs['_fields'][field_name], index)
+        attrs[field_name] = descriptor
+        descriptors.append(descriptor)
+
+    def get_data(self):
+        for descriptor in descriptors:
+            descriptor.load(self)
+        return self._decoded
+
+    def set_data(self, data):
+        self._decoded = dict(data)
+        self._raw = None
+
+    attrs['_raw'] = None
+    attrs['_data'] = property(get_data, set_data)
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+from tarantool.const import ITERATOR_GE, ITERATOR_GT
+
+from tarantism.fields import DEFAULT_DATETIME_FORMAT
+
+__all__ = ['migrate_datetime_to_epoch', 'migrate_uuid_to_binary']
+
+
+def migrate_datetime_to_epoch(model_class,
+                              field_name,
+                              datetime_format=DEFAULT_DATETIME_FORMAT,
+                              batch_size=1000):
+    """Convert stored strings of ``DateTimeField`` to epoch integers.
+
+    The field should already be declared with epoch ``storage``. Space
+    is walked by primary index in batches, every batch of updates is
+    sent in one pipeline, values which are integers already are left as
+    is, so migration can be restarted. Secondary indexes over the field
+    must be dropped before and created with ``unsigned`` type after.
+
+    :param datetime_format: format strings were stored with.
+    :returns: number of updated rows.
+
+    """
+    field = model_class._fields[field_name]
+    if getattr(field, 'epoch_unit', None) is None:
+        raise ValueError(
+            '{model_name}.{field_name} field does not use epoch storage.'.format(
+                model_name=model_class.__name__, field_name=field_name
+            ))
+
+    def convert(value):
+        if not isinstance(value, basestring):
+            return value
+
+        if value:
+            return field.to_db(datetime.strptime(value, datetime_format))
+        return None
+
+    return _rewrite_field(model_class, field_name, convert, batch_size)
+
+
+def migrate_uuid_to_binary(model_class, field_name, batch_size=1000):
+    """Convert stored 36 characters strings of ``UUIDField`` to 16 bytes.
+
+    The field should already be declared with ``binary=True``, it can't
+    be part of primary key. Rows are loaded either way, but lookups by
+    the field find only converted rows, so run migration before querying
+    by it. Like :func:`migrate_datetime_to_epoch`, it can be restarted.
+
+    :returns: number of updated rows.
+
+    """
+    field = model_class._fields[field_name]
+    if not getattr(field, 'binary', False):
+        raise ValueError(
+            '{model_name}.{field_name} field does not use binary storage.'.format(
+                model_name=model_class.__name__, field_name=field_name
+            ))
+
+    def convert(value):
+        if value and len(value) != 16:
+            return field.to_db(value)
+        return value
+
+    return _rewrite_field(model_class, field_name, convert, batch_size)
+
+
+def _rewrite_field(model_class, field_name, convert, batch_size):
+    """Update stored values of field for which ``convert`` returns new one.
+
+    Space is walked by primary index in batches, every batch of updates
+    is sent in one pipeline.
+
+    """
+    field_number = model_class._fields_ordered.index(field_name)
+    key_numbers = [
+        part['fieldno'] - 1 for part in model_class.index_info(0)['parts']
+    ]
+    if field_number in key_numbers:
+        raise ValueError(
+            '{model_name}.{field_name} field is part of primary key.'.format(
+                model_name=model_class.__name__, field_name=field_name
+            ))
+
+    space = model_class.get_space()
+
+    updated = 0
+    key, iterator = [], ITERATOR_GE
+    while True:
+        rows = list(space.select(
+            key, index=0, limit=batch_size, iterator=iterator
+        ))
+
+        with space.connection.pipeline():
+            for row in rows:
+                value = convert(row[field_number])
+                if value is row[field_number]:
+                    continue
+
+                space.update(
+                    [row[i] for i in key_numbers], [('=', field_number, value)]
+                )
+                updated += 1
+
+        if len(rows) < batch_size:
+            return updated
+
+        key, iterator = [rows[-1][i] for i in key_numbers], ITERATOR_GT
@@ -1,11 +1,20 @@
-from tarantism.core import Space
+import threading
+import time
+from copy import deepcopy
+
+from tarantism.buffer import WriteBuffer
+from tarantism.cache import make_cache_key
+from tarantism.core import Future, Space
 from tarantism.metaclasses import ModelMetaclass
 from tarantism.connection import get_space, get_connection
+from tarantism.connection import get_async_connection
 from tarantism.connection import DEFAULT_ALIAS
 from tarantism.exceptions import ValidationError, SpaceExists, IgnorableError
 
 __all__ = ['Model']
 
+_write_buffer_lock = threading.Lock()
+
 OPERATIONS_MAP = {
     'add': '+',
     'assign': '=',
@@ -15,11 +24,35 @@ OPERATIONS_MAP = {
 }
 
 
+class _IndexCache(object):
+    def __init__(self, indexes, schema_version):
+        self.indexes = indexes
+        self.schema_version = schema_version
+        self.loaded_at = time.time()
+
+        self.by_fields = {}
+        for index_no, info in sorted(indexes.iteritems(), reverse=True):
+            self.by_fields[tuple(info['fields'])] = info
+
+    def expired(self, connection, ttl=None):
+        if ttl is not None and time.time() - self.loaded_at >= ttl:
+            return True
+
+        # Pooled connections may lag behind, only newer version counts.
+        schema_version = getattr(connection, 'schema_version', None)
+        if schema_version is None:
+            return False
+
+        return self.schema_version is None or schema_version > self.schema_version
+
+
 class Model(object):
     __metaclass__ = ModelMetaclass
+    __slots__ = ()
 
     def __init__(self, **kwargs):
         self._data = {}
+        self._dirty = set()
         self._exists_in_db = kwargs.pop('exists_in_db', False)
 
         self.reset()
@@ -68,6 +101,64 @@ class Model(object):
             alias=cls._meta.get('db_alias', DEFAULT_ALIAS)
         )
 
+    @classmethod
+    def pipeline(cls, raise_on_error=True):
+        """Send requests of models sharing connection in one batch.
+
+        Inside the block :meth:`save`, :meth:`insert` and :meth:`update`
+        return immediately, :meth:`delete` returns
+        :class:`~tarantism.core.Future`.
+
+        >>> with Card.pipeline() as pipeline:
+        ...     card.save()
+        ...     card_data.save()
+
+        """
+        return cls.get_space().connection.pipeline(raise_on_error)
+
+    @classmethod
+    def get_cache(cls):
+        """Return primary key cache configured with ``meta['cache']``.
+
+        Cache keeps raw tuples so each lookup still returns fresh model,
+        it exposes ``hits`` and ``misses`` counters.
+
+        :rtype: tarantism.cache.ModelCache
+        """
+        return cls._cache
+
+    @classmethod
+    def get_write_buffer(cls):
+        """Return write buffer configured with ``meta['write_behind']``.
+
+        With it :meth:`save`, :meth:`insert`, :meth:`update` and
+        :meth:`upsert` queue requests and return immediately, requests
+        are sent in background batches. Options are passed to
+        :class:`~tarantism.buffer.WriteBuffer`.
+
+        :rtype: tarantism.buffer.WriteBuffer
+        """
+        options = cls._meta.get('write_behind')
+        if not options:
+            return None
+
+        if cls._write_buffer is None:
+            with _write_buffer_lock:
+                if cls._write_buffer is None:
+                    options = {} if options is True else options
+                    cls._write_buffer = WriteBuffer(
+                        cls.get_async_connection, **options
+                    )
+
+        return cls._write_buffer
+
+    @classmethod
+    def get_async_connection(cls):
+        '''
+        :rtype: tarantism.core.AsyncConnection
+        '''
+        return get_async_connection(cls._meta.get('db_alias', DEFAULT_ALIAS))
+
     @classmethod
     def space(cls):
         return cls.get_space()
@@ -78,9 +169,47 @@ class Model(object):
 
     @classmethod
     def indexes(cls):
-        index_map = cls.space().connection.call('indexes', cls._meta['space'])[0][0]
+        """Return space indexes keyed by index number.
+
+        Loaded once and cached on the model class until
+        :meth:`invalidate_indexes` is called, connection schema version
+        changes or ``meta['indexes_ttl']`` seconds pass.
+
+        """
+        return cls._get_index_cache().indexes
+
+    @classmethod
+    def index_for_fields(cls, *field_names):
+        """Return :meth:`indexes` entry with exactly given fields or None."""
+        return cls._get_index_cache().by_fields.get(field_names)
+
+    @classmethod
+    def invalidate_indexes(cls):
+        cls._index_cache = None
+
+    @classmethod
+    def _get_index_cache(cls):
+        cache = cls._index_cache
+        connection = cls.space().connection
+
+        if cache is None or cache.expired(connection, cls._meta.get('indexes_ttl')):
+            schema_version = getattr(connection, 'schema_version', None)
+            if cache is not None and cache.schema_version > schema_version:
+                schema_version = cache.schema_version
+
+            cache = cls._index_cache = _IndexCache(
+                cls._load_indexes(connection), schema_version
+            )
+
+        return cache
+
+    @classmethod
+    def _load_indexes(cls, connection):
+        with connection.unpipelined():
+            index_map = connection.call('indexes', cls._meta['space'])[0][0]
         index_map = {k: v for k, v in index_map.items() if isinstance(k, int)}
-        for v in index_map.itervalues():
+        for index_no, v in index_map.iteritems():
+            v.setdefault('id', index_no)
             v['fields'] = []
             for p in v.get('parts', []):
                 p['field_name'] = cls.field_name(p['fieldno'])
@@ -88,6 +217,19 @@ class Model(object):
 
         return index_map
 
+    @classmethod
+    def index_info(cls, index):
+        """Return copy of :meth:`indexes` entry by index number or name."""
+        for index_no, info in cls.indexes().iteritems():
+            if index in (index_no, info.get('name')):
+                return dict(info, id=info.get('id', index_no))
+
+        raise ValueError(
+            '{model_name} space has no index {index}.'.format(
+                model_name=cls.__name__, index=index
+            )
+        )
+
     @classmethod
     def create_index(cls, index_name=None, index_type=None, fields=None, **kwargs):
         s = cls.get_space()
@@ -108,7 +250,10 @@ class Model(object):
             **kwargs
         )
 
-        return s.create_index(index_name, index_params)
+        index = s.create_index(index_name, index_params)
+        cls.invalidate_indexes()
+
+        return index
 
     @classmethod
     def field_name(cls, field_no):
@@ -142,8 +287,24 @@ class Model(object):
         return data
 
     def validate(self):
-        for field_name, field in self._fields.items():
-            value = self._data.get(field_name)
+        if self._meta.get('lazy', False) and self._exists_in_db:
+            # Fields not decoded yet hold values loaded from database.
+            data = self._decoded
+            field_names = list(data)
+        else:
+            data = self._data
+            field_names = self._fields
+            # Deferred fields are None rather than unset, skip them.
+            deferred = getattr(self, '_deferred', ())
+            if deferred and self._exists_in_db:
+                field_names = [
+                    field_name for field_name in field_names
+                    if field_name not in deferred or field_name in self._dirty
+                ]
+
+        for field_name in field_names:
+            field = self._fields[field_name]
+            value = data.get(field_name)
             if value is not None:
                 field.validate(value)
 
@@ -153,45 +314,222 @@ class Model(object):
                 )
 
     def save(self, validate=True):
+        """Insert model or update fields changed since load or last save.
+
+        Update request is not sent at all if nothing changed. Fields
+        holding mutable values (dicts, lists, messages) which were read
+        are saved if their stored form differs from the one loaded.
+
+        """
         if validate:
             self.validate()
 
-        data = self.to_db()
-
         if self.exists_in_db:
-            return self.update(**data)
+            changes = self._dirty_to_db()
+            if not changes:
+                return self
+            return self._update(changes, assign=False)
         else:
-            return self.insert(**data)
+            return self._insert(self._encode())
 
     def insert(self, **data):
-        values = self._dict_to_values(data)
+        return self._insert(self._dict_to_values(data))
 
-        self.get_space().insert(values)
-        self._exists_in_db = True
+    def update(self, **kwargs):
+        return self._update(kwargs)
 
-        return self
+    def upsert(self, validate=True, **kwargs):
+        """Insert model or apply operations to existing row in one request.
 
-    def update(self, **kwargs):
+        Operations use :meth:`update` syntax, e.g.
+        ``card.upsert(hits__add=1)``. Model fields are not changed since
+        it is unknown which of the two happened.
+
+        """
+        if validate:
+            self.validate()
+
+        changes = self._make_changes_struct(kwargs)
+
+        self._write('upsert', self._encode(), changes)
+
+        return self._on_inserted()
+
+    def delete(self):
+        """Delete model, queued writes are flushed first."""
+        primary_key_value = self._get_primary_key_value()
+
+        write_buffer = self.get_write_buffer()
+        if write_buffer is not None:
+            write_buffer.flush()
+
+        response = self.get_space().delete(primary_key_value)
+
+        if isinstance(response, Future):
+            return response.then(self._on_deleted)
+
+        return self._on_deleted(response)
+
+    def asave(self, validate=True):
+        """Asynchronous :meth:`save`, returns :class:`~tarantism.core.Future`."""
+        if validate:
+            self.validate()
+
+        if self.exists_in_db:
+            changes = self._dirty_to_db()
+            if not changes:
+                future = Future()
+                future.set_result(self)
+                return future
+            return self._aupdate(changes, assign=False)
+        else:
+            return self._ainsert(self._encode())
+
+    def ainsert(self, **data):
+        return self._ainsert(self._dict_to_values(data))
+
+    def aupdate(self, **kwargs):
+        return self._aupdate(kwargs)
+
+    def aupsert(self, validate=True, **kwargs):
+        """Asynchronous :meth:`upsert`, returns :class:`~tarantism.core.Future`."""
+        if validate:
+            self.validate()
+
+        changes = self._make_changes_struct(kwargs)
+
+        future = self.get_async_connection().submit(
+            'upsert', self._meta['space'], self._encode(), changes
+        )
+
+        return future.then(lambda response: self._on_inserted())
+
+    def adelete(self):
+        primary_key_value = self._get_primary_key_value()
+
+        future = self.get_async_connection().submit(
+            'delete', self._meta['space'], primary_key_value
+        )
+
+        return future.then(self._on_deleted)
+
+    def _update(self, kwargs, assign=True):
         primary_key_value = self._get_primary_key_value()
 
         changes = self._make_changes_struct(kwargs)
 
-        self.get_space().update(primary_key_value, changes)
+        self._write('update', primary_key_value, changes)
 
-        self._exists_in_db = True
+        return self._on_updated(kwargs, assign)
 
-        # XXX
-        for field_name, field_value in kwargs.iteritems():
-            setattr(self, field_name, field_value)
+    def _aupdate(self, kwargs, assign=True):
+        primary_key_value = self._get_primary_key_value()
+
+        changes = self._make_changes_struct(kwargs)
+
+        future = self.get_async_connection().submit(
+            'update', self._meta['space'], primary_key_value, changes
+        )
+
+        return future.then(lambda response: self._on_updated(kwargs, assign))
+
+    def _insert(self, values):
+        self._write('insert', values)
+
+        return self._on_inserted(values)
+
+    def _write(self, method, *args):
+        write_buffer = self.get_write_buffer()
+        if write_buffer is not None:
+            on_sent = None
+            if self._cache is not None:
+                # Row may be read and cached again before write is sent.
+                cache = self._cache
+                key = make_cache_key(self._get_primary_key_value())
+                on_sent = lambda: cache.invalidate(key)
+
+            return write_buffer.put(
+                method, self._meta['space'], *args, on_sent=on_sent
+            )
+
+        return getattr(self.get_space(), method)(*args)
+
+    def _ainsert(self, values):
+        future = self.get_async_connection().submit(
+            'insert', self._meta['space'], values
+        )
+
+        return future.then(lambda response: self._on_inserted(values))
+
+    def _dirty_to_db(self):
+        # Fields not loaded by QuerySet.only() are saved only if assigned.
+        deferred = getattr(self, '_deferred', ())
+
+        snapshots = getattr(self, '_snapshots', None) or {}
+
+        data = {}
+        for field_name in self._dirty.union(snapshots):
+            value = getattr(self, field_name)
+            if field_name in deferred and value is None:
+                continue
+
+            value = self._fields[field_name].to_db(value)
+            if field_name in self._dirty or value != snapshots[field_name]:
+                data[field_name] = value
+
+        return data
+
+    def _has_changes(self):
+        return bool(self._dirty) or bool(getattr(self, '_snapshots', None))
+
+    def _invalidate_cached(self):
+        if self._cache is not None:
+            self._cache.invalidate(
+                make_cache_key(self._get_primary_key_value())
+            )
+
+    def _on_inserted(self, values=None):
+        """Mark insert done, ``values`` is stored tuple if known."""
+        self._exists_in_db = True
+        self._dirty.clear()
+        self._snapshots = None
+        self._raw = values
+        self._invalidate_cached()
 
         return self
 
-    def delete(self):
-        primary_key_value = self._get_primary_key_value()
+    def _on_updated(self, kwargs, assign=True):
+        """Mark update done, ``assign`` sets updated values to fields."""
+        self._exists_in_db = True
 
-        response = self.get_space().delete(primary_key_value)
+        # XXX
+        if assign:
+            for field_name, field_value in kwargs.iteritems():
+                setattr(self, field_name, field_value)
+
+        field_names = self._parse_fields(kwargs)
+        self._dirty.difference_update(field_names)
+
+        snapshots = getattr(self, '_snapshots', None) or {}
+        for field_name in field_names:
+            snapshots.pop(field_name, None)
+        # Loaded row is stale for updated fields, while saved values may
+        # still be changed in place through references taken before.
+        for field_name, value in kwargs.iteritems():
+            field = self._fields.get(field_name)
+            if field is not None and field.mutable:
+                snapshots[field_name] = deepcopy(
+                    field.to_db(value) if assign else value
+                )
+        self._snapshots = snapshots or None
 
+        self._invalidate_cached()
+
+        return self
+
+    def _on_deleted(self, response):
         self._exists_in_db = False
+        self._invalidate_cached()
 
         return response.rowcount > 0
 
@@ -220,17 +558,19 @@ class Model(object):
     def _get_primary_key_value(self):
         pk = getattr(self, 'pk', None)
         if pk:
-            return pk
+            field = self._fields.get('pk')
+            return field.to_db(pk) if field is not None else pk
 
         for field_name, field in self._fields.iteritems():
             if field.primary_key:
-                return getattr(self, field_name)
+                return field.to_db(getattr(self, field_name))
 
         raise ValueError(
             'Model should have primary key field.'
         )
 
-    def _parse_fields(self, data):
+    @classmethod
+    def _parse_fields(cls, data):
         field_operation_map = {}
 
         for key, value in data.iteritems():
@@ -254,10 +594,11 @@ class Model(object):
 
         return field_operation_map
 
-    def _make_changes_struct(self, data):
-        field_operation_map = self._parse_fields(data)
+    @classmethod
+    def _make_changes_struct(cls, data):
+        field_operation_map = cls._parse_fields(data)
         changes = []
-        for field_number, field_name in enumerate(self._fields_ordered):
+        for field_number, field_name in enumerate(cls._fields_ordered):
             if field_name in field_operation_map:
                 operation, value = field_operation_map[field_name]
 
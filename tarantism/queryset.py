@@ -1,9 +1,79 @@
 
 __all__ = ['QuerySetManager', 'QuerySet']
 
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from copy import copy
+from itertools import dropwhile, islice
 
+import msgpack
+from tarantool.const import (
+    ITERATOR_ALL, ITERATOR_EQ, ITERATOR_GE, ITERATOR_GT, ITERATOR_LE,
+    ITERATOR_LT, ITERATOR_REQ
+)
+
+from tarantism.cache import make_cache_key
+from tarantism.core import SELECT_LIMIT_MAX
+from tarantism.session import get_session
 from tarantism.exceptions import FieldError
 
+DEFAULT_BATCH_SIZE = 1000
+
+DEFAULT_PAGE_SIZE = 100
+
+# Walks an index range, keeps tuples matching the residual predicates.
+FILTER_LUA = '''
+local space, index, key, iterator, offset, limit, filters = ...
+local result = {}
+if limit <= 0 then
+    return result
+end
+for _, t in box.space[space].index[index]:pairs(key, {iterator = iterator}) do
+    local matched = true
+    for fieldno, value in pairs(filters) do
+        if t[fieldno] ~= value then
+            matched = false
+            break
+        end
+    end
+    if matched then
+        if offset > 0 then
+            offset = offset - 1
+        else
+            table.insert(result, t)
+            if #result >= limit then
+                break
+            end
+        end
+    end
+end
+return result
+'''
+
+# Looks up tuples by list of unique index keys, missing ones are skipped.
+IN_BULK_LUA = '''
+local space, index, keys = ...
+local result = {}
+for _, key in ipairs(keys) do
+    local t = box.space[space].index[index]:get(key)
+    if t ~= nil then
+        table.insert(result, t)
+    end
+end
+return result
+'''
+
+PROJECTION_ONLY = 'only'
+
+PROJECTION_VALUES = 'values'
+
+PROJECTION_VALUES_LIST = 'values_list'
+
+PROJECTION_FLAT = 'flat'
+
+ORDER_ASC = 'asc'
+
+ORDER_DESC = 'desc'
+
 
 class QuerySetManager(object):
     def __get__(self, instance, owner):
@@ -14,13 +84,74 @@ class QuerySetManager(object):
 
 
 class QuerySet(object):
+    """Lazy select over model space.
+
+    Nothing is fetched until queryset is iterated, sized, indexed
+    or converted to list.
+
+    """
     def __init__(self, model_class, space):
         self._model_class = model_class
         self._space = space
 
+        self._conditions = {}
+        self._key = None
+        self._index = 0
+        self._filters = None
+        self._order = ORDER_ASC
+        self._offset = 0
+        self._limit = None
+        self._projection = None
+        self._result_cache = None
+
     def __call__(self, **kwargs):
         return self.filter(**kwargs)
 
+    def __iter__(self):
+        return iter(self._fetch_all())
+
+    def __len__(self):
+        return len(self._fetch_all())
+
+    def __nonzero__(self):
+        return bool(self._fetch_all())
+
+    def __getitem__(self, item):
+        if self._result_cache is not None:
+            return self._result_cache[item]
+
+        if isinstance(item, slice):
+            if item.step is not None:
+                raise ValueError('QuerySet slicing does not support step.')
+
+            start = item.start or 0
+            stop = item.stop
+            if start < 0 or (stop is not None and stop < 0):
+                raise ValueError('QuerySet does not support negative indexing.')
+
+            if self._limit is not None:
+                stop = self._limit if stop is None else min(stop, self._limit)
+
+            limit = None if stop is None else max(stop - start, 0)
+            return self._clone(offset=self._offset + start, limit=limit)
+
+        if item < 0:
+            raise ValueError('QuerySet does not support negative indexing.')
+
+        model_list = list(self[item:item + 1])
+        if not model_list:
+            raise IndexError('QuerySet index out of range.')
+
+        return model_list[0]
+
+    def __repr__(self):
+        return '<{name}: {model_name} index={index} key={key}>'.format(
+            name=self.__class__.__name__,
+            model_name=self.model_class.__name__,
+            index=self._index,
+            key=self._key
+        )
+
     @property
     def model_class(self):
         return self._model_class
@@ -34,6 +165,14 @@ class QuerySet(object):
 
         model_list = []
         model_fields_count = len(self.model_class._fields_ordered)
+        decode = self.model_class._decode
+
+        session = get_session()
+        if self._projection is not None:
+            decode = self._projector()
+        elif session is not None:
+            def decode(values):
+                return session.load(self.model_class, values)
 
         for number, values in enumerate(response):
             if check_tuple_length and len(values) != model_fields_count:
@@ -45,45 +184,604 @@ class QuerySet(object):
                         fields=','.join(extra_fields)
                     ))
 
-            raw_data = self.model_class._values_to_dict(values)
-            model = self.model_class.from_dict(raw_data)
-            model._exists_in_db = True
-            model_list.append(model)
+            model_list.append(decode(values))
 
         return model_list
 
+    def all(self):
+        return self._clone()
+
     def filter(self, **kwargs):
-        field_name, value = kwargs.items().pop()
+        """Select models matching all ``field=value`` conditions.
 
-        if field_name not in self.model_class._fields:
+        Single condition on indexed field uses the field ``db_index``.
+        Otherwise conditions are matched against :meth:`Model.indexes`
+        and the index with the longest prefix of conditioned fields is
+        used, HASH index only if all its fields are conditioned. The rest
+        are checked on the server while walking the index.
+
+        :raises FieldError: if no index starts with conditioned field, so
+            the whole space would have to be scanned.
+
+        """
+        conditions = dict(self._conditions, **kwargs)
+
+        if len(conditions) == 1:
+            field_name, = conditions
+            if self._get_field(field_name).db_index is not None:
+                value, index = self._get_filter_key(conditions)
+                return self._clone(
+                    conditions=conditions, key=value, index=index, filters=None
+                )
+
+        return self._clone(conditions=conditions, **self._plan(conditions))
+
+    def only(self, *field_names):
+        """Load models with only given fields decoded, the rest are None.
+
+        Saving such model never overwrites fields which were not loaded
+        unless they were assigned value.
+
+        """
+        return self._clone(projection=(PROJECTION_ONLY, field_names))
+
+    def values(self, *field_names):
+        """Return dicts of decoded field values instead of models.
+
+        All fields are returned if none given.
+
+        """
+        field_names = field_names or self.model_class._fields_ordered
+        return self._clone(projection=(PROJECTION_VALUES, field_names))
+
+    def values_list(self, *field_names, **kwargs):
+        """Return tuples of decoded field values instead of models.
+
+        :param flat: return single field values themselves.
+
+        """
+        flat = kwargs.pop('flat', False)
+        if kwargs:
+            raise TypeError('Unexpected keyword arguments {names}.'.format(
+                names=', '.join(kwargs)
+            ))
+
+        if flat and len(field_names) != 1:
+            raise ValueError('values_list(flat=True) requires single field.')
+
+        field_names = field_names or self.model_class._fields_ordered
+        kind = PROJECTION_FLAT if flat else PROJECTION_VALUES_LIST
+        return self._clone(projection=(kind, field_names))
+
+    def limit(self, limit):
+        return self._clone(limit=limit)
+
+    def offset(self, offset):
+        return self._clone(offset=offset)
+
+    def order(self, order=ORDER_ASC):
+        """Iterate index in ascending or descending order.
+
+        :param order: ``'asc'`` or ``'desc'``.
+
+        """
+        if order not in (ORDER_ASC, ORDER_DESC):
+            raise ValueError('Unknown order {order}.'.format(order=order))
+
+        return self._clone(order=order)
+
+    def iterator(self, chunk_size=DEFAULT_BATCH_SIZE):
+        """Stream models fetching ``chunk_size`` rows per request."""
+        offset = self._offset
+        remaining = self._limit
+
+        while remaining is None or remaining > 0:
+            limit = chunk_size if remaining is None else min(chunk_size, remaining)
+            model_list = self._fetch(offset, limit)
+
+            for model in model_list:
+                yield model
+
+            if len(model_list) < limit:
+                return
+
+            offset += limit
+            if remaining is not None:
+                remaining -= limit
+
+    def paginate(self, index=0, after=None, page_size=DEFAULT_PAGE_SIZE):
+        """Keyset pagination over TREE index.
+
+        Every page continues from the last index key of the previous one,
+        so deep pages cost the same as the first one. Key of
+        :meth:`filter` on the same index limits pages to matching rows,
+        :meth:`order` sets direction.
+
+        :param index: index number or name.
+        :param after: cursor returned with previous page or index key
+            as list, ``None`` for the first page.
+        :param page_size:
+        :returns: ``(model_list, cursor)``, cursor is ``None`` on last page.
+
+        """
+        info, prefix = self._keyset_index(index)
+
+        if after is not None and isinstance(after, basestring):
+            after = _decode_cursor(after)
+
+        model_list, last_key = self._keyset_page(info, prefix, after, page_size)
+
+        cursor = None
+        if last_key is not None:
+            cursor = _encode_cursor(last_key)
+
+        return model_list, cursor
+
+    def stream(self, batch_size=DEFAULT_BATCH_SIZE, index=None):
+        """Generate models over TREE index fetching ``batch_size`` per request.
+
+        Like :meth:`paginate` every batch continues from the last index
+        key, only one batch is held and decoded at a time. Rows of
+        non-unique index sharing key across batches are not lost.
+        Respects :meth:`filter` key, :meth:`order` and :meth:`limit`.
+
+        :param index: index number or name, the :meth:`filter` index or
+            primary one by default.
+
+        """
+        if index is None:
+            index = self._index if self._key is not None else 0
+
+        info, prefix = self._keyset_index(index)
+        remaining = self._limit
+        after = None
+
+        while remaining is None or remaining > 0:
+            page_size = batch_size if remaining is None else min(batch_size, remaining)
+            model_list, after = self._keyset_page(info, prefix, after, page_size)
+
+            for model in model_list:
+                yield model
+
+            if after is None:
+                return
+
+            if remaining is not None:
+                remaining -= len(model_list)
+
+    def _keyset_index(self, index):
+        """Return index info and :meth:`filter` key prefix to walk it with."""
+        info = self.model_class.index_info(index)
+        if info.get('type', 'TREE').upper() != 'TREE':
+            raise ValueError(
+                'Keyset pagination requires TREE index, {name} is {type}.'.format(
+                    name=info.get('name'), type=info.get('type')
+                ))
+
+        if self._filters:
+            raise ValueError(
+                'Keyset pagination does not support conditions on fields '
+                'outside of the index.'
+            )
+
+        prefix = []
+        if self._key is not None:
+            if self._index not in (info['id'], info.get('name')):
+                raise ValueError(
+                    'Queryset is filtered over other index {index}.'.format(
+                        index=self._index
+                    ))
+            prefix = list(self._key) if isinstance(self._key, (list, tuple)) else [self._key]
+
+        return info, prefix
+
+    def _keyset_page(self, info, prefix, after, page_size):
+        """Return models after cursor key and the next cursor, None at the end.
+
+        Cursor of non-unique index is its key followed by primary key,
+        the page starts at the index key itself and rows up to the
+        primary key of the previous page end are skipped.
+
+        """
+        descending = self._order == ORDER_DESC
+        field_numbers = [part['fieldno'] - 1 for part in info['parts']]
+        key_numbers = list(field_numbers)
+        if not info.get('unique', info['id'] == 0):
+            key_numbers += [
+                part['fieldno'] - 1 for part in self.model_class.index_info(0)['parts']
+            ]
+
+        skip = None
+        if after is None:
+            key = prefix
+            iterator = ITERATOR_LE if descending else ITERATOR_GE
+        elif len(after) == len(field_numbers):
+            key = list(after)
+            iterator = ITERATOR_LT if descending else ITERATOR_GT
+        else:
+            key = list(after[:len(field_numbers)])
+            iterator = ITERATOR_LE if descending else ITERATOR_GE
+            after = list(after)
+
+            def skip(row):
+                row_key = [row[i] for i in key_numbers]
+                if row_key[:len(key)] != key:
+                    return False
+                return row_key >= after if descending else row_key <= after
+
+        # One row more than page tells whether there is next page.
+        wanted = page_size + 1
+        prefix_numbers = field_numbers[:len(prefix)]
+        rows = []
+        offset = 0
+        while len(rows) < wanted:
+            limit = wanted - len(rows)
+            batch = list(self.space.select(
+                key, index=info['id'], offset=offset, limit=limit,
+                iterator=iterator
+            ))
+            offset += len(batch)
+            exhausted = len(batch) < limit
+
+            if skip is not None:
+                batch = list(dropwhile(skip, batch))
+                if batch:
+                    skip = None
+
+            for row in batch:
+                if prefix and [row[i] for i in prefix_numbers] != prefix:
+                    exhausted = True
+                    break
+                rows.append(row)
+
+            if exhausted:
+                break
+
+        last_key = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last_key = [rows[-1][i] for i in key_numbers]
+
+        return self.to_python(rows), last_key
+
+    def select(self, *args, **kwargs):
+        response = self.space.select(*args, **kwargs)
+        return self.to_python(response)
+
+    def get(self, **kwargs):
+        queryset = self.filter(**kwargs) if kwargs else self
+        return self._get_one(queryset._fetch(queryset._offset, 2))
+
+    def in_bulk(self, keys, index=0, batch_size=DEFAULT_BATCH_SIZE):
+        """Return models by unique index keys, one request per batch.
+
+        Keys are looked up on the server, ``batch_size`` per call.
+        Primary keys are served from the session and the model cache
+        first. Results are decoded like the queryset ones, so
+        :meth:`only` and :meth:`values` apply.
+
+        :param keys: iterable of index keys, tuples for multipart index.
+        :param index: unique index number or name.
+        :returns: dict of model by key, keys with no row map to None.
+
+        """
+        if self._key is not None or self._filters:
+            raise ValueError('in_bulk() does not support filter() conditions.')
+        if self._offset or self._limit is not None or self._order != ORDER_ASC:
+            raise ValueError('in_bulk() does not support slicing and order().')
+
+        info = self.model_class.index_info(index)
+        if not info.get('unique', info['id'] == 0):
+            raise ValueError('in_bulk() requires unique index, {name} is not.'
+                             .format(name=info.get('name', index)))
+
+        fields = [self._get_field(field_name) for field_name in info['fields']]
+        field_numbers = [part['fieldno'] - 1 for part in info['parts']]
+        multipart = len(fields) > 1
+
+        result = {}
+        pending = {}
+        for key in keys:
+            key_values = tuple(key) if multipart else (key,)
+            if multipart:
+                key = key_values
+            if key in result:
+                continue
+            result[key] = None
+
+            for field, value in zip(fields, key_values):
+                field.validate(value)
+            pending[tuple([
+                field.to_db(value) for field, value in zip(fields, key_values)
+            ])] = key
+
+        cache = None
+        if info['id'] == 0 and self._projection is None:
+            cache = self.model_class._cache
+            session = get_session()
+
+            cached = {}
+            for db_key, key in pending.items():
+                model = session and session.get(
+                    self.model_class, fields[0].to_python(db_key[0])
+                )
+                if model is not None:
+                    result[key] = model
+                    del pending[db_key]
+                    continue
+
+                row = cache.get(db_key[0]) if cache is not None else None
+                if row is not None:
+                    cached[db_key] = (key, row)
+                    del pending[db_key]
+
+            self._in_bulk_decode(
+                [row for _, row in cached.itervalues()], field_numbers,
+                {db_key: key for db_key, (key, _) in cached.iteritems()},
+                result
+            )
+
+        token = cache.begin() if cache is not None else None
+        db_keys = list(pending)
+        for start in xrange(0, len(db_keys), batch_size):
+            with self.space.connection.unpipelined():
+                batch = db_keys[start:start + batch_size]
+                response = self.space.connection.eval(IN_BULK_LUA, [
+                    self.space.name, info['id'],
+                    [list(db_key) for db_key in batch],
+                ])
+            rows = response.data[0] if response.data else []
+
+            if cache is not None:
+                for row in rows:
+                    cache.set(row[field_numbers[0]], row, token)
+
+            self._in_bulk_decode(rows, field_numbers, pending, result)
+
+        return result
+
+    def _in_bulk_decode(self, rows, field_numbers, keys, result):
+        """Decode rows into ``result`` under keys of their index values."""
+        row_keys = [keys[tuple([row[i] for i in field_numbers])] for row in rows]
+        for key, model in zip(row_keys, self.to_python(rows)):
+            result[key] = model
+
+    def afilter(self, **kwargs):
+        """Asynchronous :meth:`filter`, returns :class:`~tarantism.core.Future`."""
+        return self.filter(**kwargs)._afetch()
+
+    def aselect(self, *args, **kwargs):
+        future = self.model_class.get_async_connection().submit(
+            'select', self.space.name, *args, **kwargs
+        )
+
+        return future.then(self.to_python)
+
+    def aget(self, **kwargs):
+        return self.filter(**kwargs)._afetch(limit=2).then(self._get_one)
+
+    def _clone(self, **kwargs):
+        queryset = copy(self)
+        queryset._result_cache = None
+
+        for name, value in kwargs.iteritems():
+            setattr(queryset, '_' + name, value)
+
+        return queryset
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            self._result_cache = self._fetch(self._offset, self._limit)
+
+        return self._result_cache
+
+    def _fetch(self, offset, limit):
+        primary_key = self._primary_key(offset, limit)
+        cache = self.model_class._cache if primary_key is not None else None
+
+        if primary_key is not None:
+            session = get_session()
+            field = self.model_class._fields[self.model_class._primary_field]
+            model = session and session.get(
+                self.model_class, field.to_python(primary_key)
+            )
+            if model is not None:
+                return [model]
+
+        token = None
+        if cache is not None:
+            row = cache.get(primary_key)
+            if row is not None:
+                return self.to_python([row])
+            token = cache.begin()
+
+        if self._filters:
+            with self.space.connection.unpipelined():
+                response = self.space.connection.eval(
+                    FILTER_LUA, self._filter_args(offset, limit)
+                )
+        else:
+            response = self.space.select(
+                self._key, **self._select_kwargs(offset, limit)
+            )
+
+        rows = self._response_rows(response)
+        if cache is not None and len(rows) == 1:
+            cache.set(primary_key, rows[0], token)
+
+        return self.to_python(rows)
+
+    def _primary_key(self, offset, limit):
+        """Return key if query is lookup of single row by primary key."""
+        if self.model_class._primary_field is None or self._filters:
+            return None
+
+        if self._projection is not None:
+            return None
+
+        if self._index != 0 or offset or limit == 0:
+            return None
+
+        return make_cache_key(self._key)
+
+    def _afetch(self, offset=None, limit=None):
+        connection = self.model_class.get_async_connection()
+
+        if self._filters:
+            future = connection.submit(
+                'eval', FILTER_LUA, self._filter_args(offset, limit)
+            )
+        else:
+            future = connection.submit(
+                'select', self.space.name, self._key,
+                **self._select_kwargs(offset, limit)
+            )
+
+        return future.then(
+            lambda response: self.to_python(self._response_rows(response))
+        )
+
+    def _response_rows(self, response):
+        if self._filters:
+            return response.data[0] if response.data else []
+        return response
+
+    def _filter_args(self, offset, limit):
+        kwargs = self._select_kwargs(offset, limit)
+        has_key = self._key not in (None, [], ())
+        iterator = kwargs.get(
+            'iterator', ITERATOR_EQ if has_key else ITERATOR_ALL
+        )
+
+        return [
+            self.space.name, kwargs['index'], self._key or [], iterator,
+            kwargs['offset'], kwargs['limit'], self._filters
+        ]
+
+    def _select_kwargs(self, offset=None, limit=None):
+        limit = self._limit if limit is None else limit
+        kwargs = {
+            'index': self._index,
+            'offset': self._offset if offset is None else offset,
+            'limit': SELECT_LIMIT_MAX if limit is None else limit,
+        }
+
+        if self._order == ORDER_DESC:
+            has_key = self._key not in (None, [], ())
+            kwargs['iterator'] = ITERATOR_REQ if has_key else ITERATOR_LE
+
+        return kwargs
+
+    def _plan(self, conditions):
+        """Split conditions into index key and residual filters."""
+        fields = {}
+        for field_name, value in conditions.iteritems():
+            fields[field_name] = self._get_field(field_name)
+            fields[field_name].validate(value)
+
+        index, prefix = 0, []
+        for index_no, info in sorted(self.model_class.indexes().iteritems()):
+            index_prefix = []
+            for field_name in info['fields']:
+                if field_name not in conditions:
+                    break
+                index_prefix.append(field_name)
+
+            # HASH index can not be searched by partial key.
+            is_hash = info.get('type', 'TREE').upper() == 'HASH'
+            if is_hash and len(index_prefix) != len(info['fields']):
+                continue
+
+            if len(index_prefix) > len(prefix):
+                index, prefix = index_no, index_prefix
+
+        if not prefix:
             raise FieldError(
-                '{model_name} model does not have {field_name} field.'.format(
+                '{model_name} model has no index on {field_names} fields.'.format(
                     model_name=self._model_class.__name__,
-                    field_name=field_name
+                    field_names=', '.join(sorted(conditions))
                 ))
 
-        field = self.model_class._fields[field_name]
+        key = [
+            fields[field_name].to_db(conditions[field_name])
+            for field_name in prefix
+        ]
+
+        filters = {}
+        for field_name, value in conditions.iteritems():
+            if field_name not in prefix:
+                field_no = self.model_class._fields_ordered.index(field_name) + 1
+                filters[field_no] = fields[field_name].to_db(value)
+
+        return {
+            'key': key or None,
+            'index': index,
+            'filters': filters or None,
+        }
+
+    def _projector(self):
+        """Return function decoding only projected columns of tuple."""
+        kind, field_names = self._projection
+        fields_ordered = self.model_class._fields_ordered
+
+        columns = []
+        for field_name in field_names:
+            field = self._get_field(field_name)
+            columns.append(
+                (field_name, fields_ordered.index(field_name), field.to_python)
+            )
+
+        if kind == PROJECTION_FLAT:
+            (_, number, to_python), = columns
+            return lambda values: to_python(values[number])
+
+        if kind == PROJECTION_VALUES_LIST:
+            return lambda values: tuple([
+                to_python(values[number]) for _, number, to_python in columns
+            ])
+
+        if kind == PROJECTION_VALUES:
+            return lambda values: {
+                field_name: to_python(values[number])
+                for field_name, number, to_python in columns
+            }
 
-        if field.db_index is None:
+        model_class = self.model_class
+        deferred = frozenset(fields_ordered).difference(field_names)
+
+        def decode(values):
+            model = model_class.__new__(model_class)
+            model._data = {}
+            model._dirty = set()
+            for field_name, number, to_python in columns:
+                setattr(model, field_name, to_python(values[number]))
+            model._dirty.clear()
+            model._deferred = deferred
+            model._raw = values
+            model._exists_in_db = True
+            return model
+
+        return decode
+
+    def _get_field(self, field_name):
+        if field_name not in self.model_class._fields:
             raise FieldError(
-                '{model_name} model {field_name} field is not marked as indexed.'.format(
+                '{model_name} model does not have {field_name} field.'.format(
                     model_name=self._model_class.__name__,
                     field_name=field_name
                 ))
 
-        field.validate(value)
+        return self.model_class._fields[field_name]
 
-        field_types = self.model_class._get_tarantool_filter_types()
+    def _get_filter_key(self, kwargs):
+        field_name, value = kwargs.items().pop()
 
-        response = self.space.select(value, index=field.db_index, field_types=field_types)
-        return self.to_python(response)
+        field = self._get_field(field_name)
+        field.validate(value)
 
-    def select(self, *args, **kwargs):
-        response = self.space.select(*args, **kwargs)
-        return self.to_python(response)
+        return field.to_db(value), field.db_index
 
-    def get(self, **kwargs):
-        model_list = self.filter(**kwargs)
+    def _get_one(self, model_list):
         if not model_list:
             raise self.model_class.DoesNotExist(
                 '{model_class} instance does not exists.'.format(
@@ -102,13 +800,104 @@ class QuerySet(object):
     def create(self, **kwargs):
         return self.model_class(**kwargs).save()
 
+    def bulk_create(self, models, batch_size=DEFAULT_BATCH_SIZE, validate=True):
+        """Insert models in pipelined batches.
+
+        Invalid or rejected rows do not abort the rest of the batch.
+
+        :param models: iterable of model instances, may be generator.
+        :param batch_size: number of rows sent in one pipeline.
+        :param validate:
+        :returns: list of ``(model, exception)`` for rows not written.
+
+        """
+        return self._bulk_write('insert', models, batch_size, validate)
+
+    def bulk_replace(self, models, batch_size=DEFAULT_BATCH_SIZE, validate=True):
+        """Insert or replace models in pipelined batches.
+
+        See :meth:`bulk_create` for parameters.
+
+        """
+        return self._bulk_write('replace', models, batch_size, validate)
+
+    def bulk_upsert(self, models, ops=None, batch_size=DEFAULT_BATCH_SIZE,
+                    validate=True):
+        """Upsert models in pipelined batches.
+
+        Missing rows are inserted, existing ones get ``ops`` applied.
+
+        :param ops: dict of update operations in :meth:`Model.update`
+            syntax, e.g. ``{'hits__add': 1}``. Existing rows are left
+            as is if empty.
+
+        See :meth:`bulk_create` for other parameters.
+
+        """
+        changes = self.model_class._make_changes_struct(ops or {})
+
+        return self._bulk_write(
+            'upsert', models, batch_size, validate, changes
+        )
+
+    def _bulk_write(self, method, models, batch_size, validate, *args):
+        encode = self.model_class._encode
+        write = getattr(self.space, method)
+
+        failed = []
+        models = iter(models)
+        while True:
+            batch = list(islice(models, batch_size))
+            if not batch:
+                break
+
+            written = []
+            # Pipeline may be shared with requests made outside, so the
+            # future of every write is kept with its model.
+            with self.space.connection.pipeline(raise_on_error=False):
+                for model in batch:
+                    try:
+                        if validate:
+                            model.validate()
+                        values = encode(model)
+                    except Exception as e:
+                        failed.append((model, e))
+                        continue
+
+                    written.append((model, values, write(values, *args)))
+
+            for model, values, future in written:
+                exception = future.exception()
+                if exception is not None:
+                    failed.append((model, exception))
+                else:
+                    model._on_inserted(values)
+
+        return failed
+
     def delete(self, **kwargs):
         values = []
         for field_name in self.model_class._fields_ordered:
             field = self.model_class._fields[field_name]
             if field_name in kwargs:
-                values.append(field.to_python(kwargs[field_name]))
+                values.append(field.to_db(kwargs[field_name]))
 
         response = self.space.delete(values)
 
+        if self.model_class._cache is not None:
+            self.model_class._cache.invalidate(make_cache_key(values))
+
         return response.rowcount > 0
+
+
+def _encode_cursor(key):
+    return urlsafe_b64encode(msgpack.packb(key))
+
+
+def _decode_cursor(cursor):
+    try:
+        return msgpack.unpackb(urlsafe_b64decode(str(cursor)), use_list=True)
+    except Exception:
+        raise ValueError('Invalid pagination cursor {cursor}.'.format(
+            cursor=cursor
+        ))
@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+
+from tarantism.cache import make_cache_key
+
+__all__ = ['Session', 'get_session']
+
+_local = threading.local()
+
+
+def get_session():
+    """Return innermost active :class:`Session` of current thread or None."""
+    stack = getattr(_local, 'sessions', None)
+    return stack[-1] if stack else None
+
+
+class Session(object):
+    """Identity map for one unit of work.
+
+    Inside the block models loaded by primary key are the same instances,
+    :meth:`QuerySet.get` by primary key of already loaded model does not
+    hit the database. Changed models are saved in one pipelined batch per
+    connection when the block exits without exception.
+
+    >>> with Session():
+    ...     card = Card.objects.get(id=1)
+    ...     card.is_published = True
+    ...     assert Card.objects.get(id=1) is card
+
+    """
+    def __init__(self):
+        self._identity_map = {}
+        self._new = []
+
+    def __enter__(self):
+        if getattr(_local, 'sessions', None) is None:
+            _local.sessions = []
+        _local.sessions.append(self)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        _local.sessions.pop()
+
+        if exc_type is None:
+            self.flush()
+
+    def add(self, model):
+        """Save new model on :meth:`flush` and keep it in identity map."""
+        if model.exists_in_db:
+            self._register(model)
+        else:
+            self._new.append(model)
+
+    def get(self, model_class, key):
+        """Return loaded model by primary key or None."""
+        model = self._identity_map.get(self._identity_key(model_class, key))
+        if model is not None and model.exists_in_db:
+            return model
+
+        return None
+
+    def load(self, model_class, values):
+        """Return loaded instance for row, decode it if seen first time."""
+        field_name = model_class._primary_field
+        if field_name is None:
+            return model_class._decode(values)
+
+        field = model_class._fields[field_name]
+        key = field.to_python(values[model_class._fields_ordered.index(field_name)])
+
+        model = self.get(model_class, key)
+        if model is None:
+            model = model_class._decode(values)
+            self._register(model)
+
+        return model
+
+    def flush(self):
+        """Save new and changed models, one pipeline per connection."""
+        groups = OrderedDict()
+
+        models = self._new + [
+            model for model in self._identity_map.itervalues()
+            if model.exists_in_db and model._has_changes()
+        ]
+        for model in models:
+            connection = model.get_space().connection
+            groups.setdefault(connection, []).append(model)
+
+        for connection, models in groups.iteritems():
+            with connection.pipeline():
+                for model in models:
+                    model.save()
+
+        new, self._new = self._new, []
+        for model in new:
+            self._register(model)
+
+    def clear(self):
+        self._identity_map.clear()
+        self._new = []
+
+    def _register(self, model):
+        model_class = type(model)
+        if model_class._primary_field is None:
+            return
+
+        key = getattr(model, model_class._primary_field)
+        self._identity_map[self._identity_key(model_class, key)] = model
+
+    @staticmethod
+    def _identity_key(model_class, key):
+        return model_class, make_cache_key(key)
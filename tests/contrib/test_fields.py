@@ -1,8 +1,13 @@
 
 import json
+import zlib
 
+from tarantism import BaseField
 from tarantism.tests import TestCase
+from tarantism.contrib import fields as contrib_fields
+from tarantism.contrib.fields import CompressedField
 from tarantism.contrib.fields import JsonField
+from tarantism.contrib.fields import LazyMessage
 from tarantism.contrib.fields import ProtobufField
 
 
@@ -38,3 +43,144 @@ class ProtobufFieldSerializationTestCase(TestCase):
 
         self.assertEqual(value_to_db, user.SerializeToString())
         self.assertEqual(value_to_python, user)
+
+
+class LazyProtobufFieldTestCase(TestCase):
+    def setUp(self):
+        from .message_pb2 import User
+
+        self.field = ProtobufField(User, lazy=True)
+
+        user = User()
+        user.id = 1
+        user.name = 'name'
+        user.email = 'test@example.com'
+        self.raw = user.SerializeToString()
+
+    def test_not_parsed(self):
+        value = self.field.to_python(self.raw)
+
+        self.assertIsInstance(value, LazyMessage)
+        self.assertIsNone(value._message)
+        self.assertIs(self.raw, self.field.to_db(value))
+
+    def test_read(self):
+        value = self.field.to_python(self.raw)
+
+        self.assertEqual(u'name', value.name)
+        self.assertTrue(value.HasField('id'))
+        self.assertFalse(value.modified)
+        self.assertIs(self.raw, self.field.to_db(value))
+
+    def test_modified(self):
+        value = self.field.to_python(self.raw)
+        value.email = 'other@example.com'
+
+        self.assertTrue(value.modified)
+        self.assertNotEqual(self.raw, self.field.to_db(value))
+        self.assertEqual(
+            u'other@example.com',
+            self.field.to_python(self.field.to_db(value)).email
+        )
+
+    def test_mutating_method(self):
+        value = self.field.to_python(self.raw)
+        value.ClearField('email')
+
+        self.assertTrue(value.modified)
+        self.assertFalse(self.field.to_python(self.field.to_db(value)).HasField('email'))
+
+    def test_eager(self):
+        from .message_pb2 import User
+
+        field = ProtobufField(User)
+
+        self.assertIsInstance(field.to_python(self.raw), User)
+
+    def test_list_fields_modified(self):
+        value = self.field.to_python(self.raw)
+        value.ListFields()
+
+        self.assertTrue(value.modified)
+
+    def test_copy_from(self):
+        from .message_pb2 import User
+
+        value = self.field.to_python(self.raw)
+        value.CopyFrom(self.field.to_python(self.raw))
+
+        self.assertTrue(value.modified)
+        self.assertEqual(u'name', value.name)
+
+        user = User()
+        user.MergeFrom(value.message)
+        self.assertEqual(value, user)
+
+
+class CompressedFieldTestCase(TestCase):
+    def setUp(self):
+        self.value = {'text': u'lorem ipsum ' * 100, 'tags': range(10)}
+
+    def test_compressed(self):
+        field = CompressedField(JsonField(), threshold=512)
+
+        value_to_db = field.to_db(self.value)
+
+        self.assertEqual('\x00z', value_to_db[:2])
+        self.assertEqual(self.value, json.loads(zlib.decompress(value_to_db[2:])))
+        self.assertEqual(self.value, field.to_python(value_to_db))
+
+    def test_below_threshold(self):
+        field = CompressedField(JsonField(), threshold=512)
+        value = {'text': u'short'}
+
+        value_to_db = field.to_db(value)
+
+        self.assertEqual(JsonField().to_db(value), value_to_db)
+        self.assertEqual(value, field.to_python(value_to_db))
+
+    def test_uncompressed_row(self):
+        field = CompressedField(JsonField(), threshold=16)
+
+        self.assertEqual(self.value, field.to_python(json.dumps(self.value)))
+
+    def test_marker_escaped(self):
+        field = CompressedField(BaseField(), threshold=512)
+
+        value_to_db = field.to_db('\x00raw')
+
+        self.assertEqual('\x00r\x00raw', value_to_db)
+        self.assertEqual('\x00raw', field.to_python(value_to_db))
+
+    def test_incompressible(self):
+        field = CompressedField(BaseField(), threshold=4)
+
+        self.assertEqual('abcdef', field.to_db('abcdef'))
+
+    def test_none(self):
+        field = CompressedField(BaseField())
+
+        self.assertIsNone(field.to_db(None))
+        self.assertIsNone(field.to_python(None))
+
+    def test_dictionary_requires_zstd(self):
+        self.assertRaises(
+            ValueError, CompressedField, JsonField(), dictionary='dictionary'
+        )
+
+    def test_unknown_codec(self):
+        self.assertRaises(ValueError, CompressedField, JsonField(), codec='lzma')
+
+    def test_zstd(self):
+        if contrib_fields.zstandard is None:
+            self.assertRaises(
+                ImportError, CompressedField, JsonField(), codec='zstd'
+            )
+            return
+
+        field = CompressedField(JsonField(), codec='zstd')
+
+        value_to_db = field.to_db(self.value)
+
+        self.assertEqual('\x00s', value_to_db[:2])
+        self.assertEqual(self.value, field.to_python(value_to_db))
@@ -9,6 +9,7 @@ from tarantism import models
 from tarantism import DoesNotExist
 from tarantism import ValidationError
 from tarantism import FieldError
+from tarantism import QuerySet
 from tarantism.fields import INT64_MAX
 from tarantism.tests import TestCase
 
@@ -192,6 +193,60 @@ class ModelUpdateTestCase(DatabaseTestCase):
         self.assertEqual(11, r2.counter)
 
 
+class ModelAsyncTestCase(DatabaseTestCase):
+    def test_asave_and_aget(self):
+        class Record(models.Model):
+            pk = models.Num64Field(primary_key=True, db_index=0)
+            data = models.StringField()
+
+        futures = [Record(pk=pk, data=u'test').asave() for pk in (1L, 2L)]
+        for future in futures:
+            self.assertIsInstance(future.result(), Record)
+
+        record = Record.objects.aget(pk=2L).result()
+
+        self.assertEqual(2L, record.pk)
+        self.assertTrue(record.exists_in_db)
+
+    def test_adelete(self):
+        class Record(models.Model):
+            pk = models.Num64Field(primary_key=True, db_index=0)
+            data = models.StringField()
+
+        r = Record(pk=1L, data=u'test').save()
+
+        self.assertTrue(r.adelete().result())
+        self.assertFalse(r.exists_in_db)
+
+
+class ModelPipelineTestCase(DatabaseTestCase):
+    def test_pipeline(self):
+        class Record(models.Model):
+            pk = models.Num64Field(primary_key=True, db_index=0)
+            data = models.StringField()
+
+        with Record.pipeline() as pipeline:
+            for pk in (1L, 2L, 3L):
+                Record(pk=pk, data=u'test').save()
+
+            self.assertEqual(3, len(pipeline))
+
+        self.assertEqual([], pipeline.errors)
+        self.assertEqual(3, len(Record.objects.select([])))
+
+    def test_pipeline_errors(self):
+        class Record(models.Model):
+            pk = models.Num64Field(primary_key=True, db_index=0)
+            data = models.StringField()
+
+        with Record.pipeline(raise_on_error=False) as pipeline:
+            Record(pk=1L, data=u'test').save()
+            Record(pk=1L, data=u'duplicate').save()
+
+        self.assertEqual(1, len(pipeline.errors))
+        self.assertEqual(1, pipeline.errors[0][0])
+
+
 class ManagerGetTestCase(DatabaseTestCase):
     def test_get_does_not_exist(self):
         class Record(models.Model):
@@ -286,7 +341,7 @@ class ManagerFilterTestCase(DatabaseTestCase):
 
         records = Record.objects.filter(pk=1L)
 
-        self.assertIsInstance(records, list)
+        self.assertIsInstance(records, QuerySet)
         self.assertEqual(0, len(records))
 
     def test_filter_many_items(self):
@@ -309,7 +364,7 @@ class ManagerFilterTestCase(DatabaseTestCase):
 
         records = Record.objects.filter(user_id=user_id)
 
-        self.assertIsInstance(records, list)
+        self.assertIsInstance(records, QuerySet)
         self.assertEqual(2, len(records))
 
         for r in records:
@@ -345,6 +400,21 @@ class ManagerFilterTestCase(DatabaseTestCase):
         with self.assertRaises(FieldError):
             Record.objects.get(data=data)
 
+    def test_filter_empty_slice(self):
+        class Record(models.Model):
+            pk = models.Num64Field(primary_key=True, db_index=0)
+            data = models.StringField()
+
+        Record(pk=1L, data=u'test').save()
+
+        self.assertEqual([], list(Record.objects.filter(pk=1L)[0:0]))
+        self.assertEqual(
+            [], list(Record.objects.filter(pk=1L, data=u'test')[0:0])
+        )
+        self.assertEqual(
+            1, len(Record.objects.filter(pk=1L, data=u'test')[0:1])
+        )
+
     def test_filter_by_invalid_value(self):
         class Record(models.Model):
             pk = models.Num64Field(primary_key=True, db_index=0)
@@ -0,0 +1,184 @@
+import os
+import signal
+import threading
+from contextlib import contextmanager
+
+from tarantism import Model
+from tarantism import Num64Field
+from tarantism import StringField
+from tarantism import WriteBufferFull
+from tarantism.buffer import WriteBuffer
+from tarantism.core import Future
+from tarantism.tests import TestCase
+
+
+class FakePipeline(object):
+    def __init__(self):
+        self.futures = []
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.batches = []
+        self.released = threading.Event()
+        self.released.set()
+
+    @contextmanager
+    def pipeline(self, raise_on_error=True):
+        self.released.wait()
+        self._pipeline = FakePipeline()
+        self._batch = []
+        yield self._pipeline
+        self.batches.append(self._batch)
+
+    def insert(self, space_name, values):
+        self._batch.append((space_name, values))
+
+        future = Future()
+        if values[0] < 0:
+            future.set_exception(ValueError(values))
+        else:
+            future.set_result(None)
+        self._pipeline.futures.append(future)
+
+
+class WriteBufferTestCase(TestCase):
+    def setUp(self):
+        self.connection = FakeConnection()
+
+    def test_batch_size(self):
+        write_buffer = WriteBuffer(self.connection, batch_size=2, flush_interval=60)
+        for pk in range(5):
+            write_buffer.put('insert', 'records', (pk,))
+
+        self.assertTrue(write_buffer.flush())
+        write_buffer.close()
+
+        self.assertEqual([2, 2, 1], [len(b) for b in self.connection.batches])
+        self.assertEqual(0, len(write_buffer))
+
+    def test_on_sent(self):
+        sent = []
+        write_buffer = WriteBuffer(self.connection, flush_interval=60)
+        write_buffer.put('insert', 'records', (1,), on_sent=lambda: sent.append(1))
+        write_buffer.put('insert', 'records', (-1,), on_sent=lambda: sent.append(-1))
+
+        self.assertEqual([], sent)
+        write_buffer.flush()
+        write_buffer.close()
+
+        self.assertEqual([1, -1], sent)
+
+    def test_back_pressure(self):
+        self.connection.released.clear()
+        write_buffer = WriteBuffer(
+            self.connection, batch_size=1, flush_interval=0,
+            max_pending=1, put_timeout=0.01
+        )
+        write_buffer.put('insert', 'records', (1,))
+        write_buffer.put('insert', 'records', (2,))
+
+        with self.assertRaises(WriteBufferFull):
+            write_buffer.put('insert', 'records', (3,))
+
+        self.connection.released.set()
+        write_buffer.close()
+
+        self.assertEqual(2, len(self.connection.batches))
+
+    def test_errors(self):
+        failed = []
+        write_buffer = WriteBuffer(
+            self.connection, on_error=lambda r, e: failed.append(r)
+        )
+        write_buffer.put('insert', 'records', (-1,))
+        write_buffer.put('insert', 'records', (1,))
+        write_buffer.close()
+
+        self.assertEqual([('insert', ('records', (-1,)))], failed)
+        self.assertEqual(1, len(write_buffer.errors))
+
+        with self.assertRaises(RuntimeError):
+            write_buffer.put('insert', 'records', (2,))
+
+    def test_fork(self):
+        connections = {}
+
+        def get_connection():
+            return connections.setdefault(os.getpid(), FakeConnection())
+
+        write_buffer = WriteBuffer(get_connection, flush_interval=60)
+        write_buffer.put('insert', 'records', (1,))
+
+        # Lock is held by parent thread at the moment of fork.
+        write_buffer._condition.acquire()
+        pid = os.fork()
+        if pid == 0:
+            signal.alarm(5)
+            try:
+                write_buffer.put('insert', 'records', (2,))
+                write_buffer.flush()
+                batches = connections[os.getpid()].batches
+                os._exit(0 if batches == [[('records', (2,))]] else 1)
+            except BaseException:
+                os._exit(2)
+
+        write_buffer._condition.release()
+        _, status = os.waitpid(pid, 0)
+        write_buffer.close()
+
+        self.assertEqual(0, status)
+        self.assertEqual([[('records', (1,))]], connections[os.getpid()].batches)
+
+
+class ModelWriteBehindTestCase(TestCase):
+    def test_save(self):
+        connection = FakeConnection()
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+
+            meta = {
+                'space': 'records',
+                'write_behind': {'flush_interval': 60},
+            }
+
+            @classmethod
+            def get_async_connection(cls):
+                return connection
+
+        record = Record(pk=1L, data=u'test')
+        record.save()
+
+        self.assertTrue(record.exists_in_db)
+        self.assertEqual([], connection.batches)
+
+        Record.get_write_buffer().close()
+
+        self.assertEqual([[('records', (1L, 'test'))]], connection.batches)
+
+    def test_cache_invalidated_after_send(self):
+        connection = FakeConnection()
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+
+            meta = {
+                'space': 'records',
+                'write_behind': {'flush_interval': 60},
+                'cache': {'max_size': 10},
+            }
+
+            @classmethod
+            def get_async_connection(cls):
+                return connection
+
+        Record(pk=1L, data=u'test').save()
+        # Read before the write reaches server caches the old row.
+        Record.get_cache().set(1L, (1L, 'old'))
+
+        Record.get_write_buffer().close()
+
+        self.assertIsNone(Record.get_cache().get(1L))
@@ -0,0 +1,82 @@
+from mock import patch
+
+from tarantism.cache import ModelCache
+from tarantism.cache import make_cache_key
+from tarantism.tests import TestCase
+
+
+class ModelCacheTestCase(TestCase):
+    def test_counters(self):
+        cache = ModelCache()
+        cache.set(1, (1, 'test'))
+
+        self.assertEqual((1, 'test'), cache.get(1))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_stale_read_not_cached(self):
+        cache = ModelCache()
+        token = cache.begin()
+        cache.invalidate(1)
+
+        cache.set(1, (1, 'stale'), token)
+        cache.set(2, (2, 'test'), token)
+
+        self.assertIsNone(cache.get(1))
+        self.assertEqual((2, 'test'), cache.get(2))
+
+        cache.set(1, (1, 'fresh'), cache.begin())
+        self.assertEqual((1, 'fresh'), cache.get(1))
+
+    def test_forgotten_invalidations(self):
+        cache = ModelCache(max_size=1)
+        cache._max_invalidated = 1
+        token = cache.begin()
+        cache.invalidate(1)
+        cache.invalidate(2)
+
+        cache.set(1, (1, 'stale'), token)
+
+        self.assertIsNone(cache.get(1))
+
+    def test_lru(self):
+        cache = ModelCache(max_size=2)
+        cache.set(1, (1,))
+        cache.set(2, (2,))
+        cache.get(1)
+        cache.set(3, (3,))
+
+        self.assertIsNotNone(cache.get(1))
+        self.assertIsNone(cache.get(2))
+
+    def test_fifo(self):
+        cache = ModelCache(max_size=2, policy='fifo')
+        cache.set(1, (1,))
+        cache.set(2, (2,))
+        cache.get(1)
+        cache.set(3, (3,))
+
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(2, len(cache))
+
+    def test_ttl(self):
+        cache = ModelCache(ttl=10)
+
+        with patch('tarantism.cache.time.time', return_value=100):
+            cache.set(1, (1,))
+
+        with patch('tarantism.cache.time.time', return_value=105):
+            self.assertIsNotNone(cache.get(1))
+
+        with patch('tarantism.cache.time.time', return_value=110):
+            self.assertIsNone(cache.get(1))
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            ModelCache(policy='random')
+
+    def test_make_cache_key(self):
+        self.assertEqual(1, make_cache_key([1]))
+        self.assertIsNone(make_cache_key([1, 2]))
+        self.assertIsNone(make_cache_key(None))
@@ -1,16 +1,24 @@
+import os
 
+from mock import Mock
 from mock import patch
 
 from tarantool import Connection
+from tarantool import NetworkError
 from tarantool.space import Space
 
+from tarantism import connection as connection_module
 from tarantism.tests import TestCase
 from tarantism import register_connection
 from tarantism import connect
 from tarantism import disconnect
 from tarantism import get_connection
 from tarantism import get_space
+from tarantism import get_pool
+from tarantism import warm_up
 from tarantism import ConnectionError
+from tarantism import ConnectionPool
+from tarantism import PooledConnection
 
 
 class ConnectionTestCase(TestCase):
@@ -132,3 +140,103 @@ class ConnectionTestCase(TestCase):
             register_connection(
                 self.alias, host=self.host, port=invalid_port
             )
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def call(self, *args):
+        return self, args
+
+
+class ConnectionPoolTestCase(TestCase):
+    def test_reuse_released_connection(self):
+        pool = ConnectionPool(FakeConnection, max_size=2)
+
+        connection = pool.acquire()
+        pool.release(connection)
+
+        self.assertIs(connection, pool.acquire())
+        self.assertEqual(1, pool.size)
+
+    def test_checkout_timeout(self):
+        pool = ConnectionPool(FakeConnection, max_size=1, checkout_timeout=0.01)
+        pool.acquire()
+
+        with self.assertRaises(ConnectionError):
+            pool.acquire()
+
+    def test_idle_eviction(self):
+        pool = ConnectionPool(
+            FakeConnection, min_size=1, max_size=3, idle_timeout=0
+        )
+        connections = [pool.acquire() for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+
+        pool.acquire()
+
+        self.assertEqual(1, pool.size)
+        self.assertTrue(connections[0].closed)
+        self.assertTrue(connections[1].closed)
+
+    def test_discard_on_network_error(self):
+        pool = ConnectionPool(FakeConnection, max_size=1)
+
+        with self.assertRaises(NetworkError):
+            with pool.connection() as connection:
+                raise NetworkError()
+
+        self.assertTrue(connection.closed)
+        self.assertEqual(0, pool.size)
+
+    def test_pooled_connection_borrows_per_call(self):
+        pool = ConnectionPool(FakeConnection, max_size=1)
+        pooled = PooledConnection(pool)
+
+        connection, args = pooled.call('func', 1)
+
+        self.assertEqual(('func', 1), args)
+        self.assertIs(connection, pool.acquire())
+
+    def test_invalid_bounds(self):
+        with self.assertRaises(ValueError):
+            ConnectionPool(FakeConnection, min_size=2, max_size=1)
+
+
+class ForkSafeRegistryTestCase(TestCase):
+    @patch('tarantism.connection._owner_pid', os.getpid())
+    @patch.dict('tarantism.connection._connection_settings', {}, clear=True)
+    @patch.dict('tarantism.connection._connections', {}, clear=True)
+    @patch.dict('tarantism.connection._spaces', {}, clear=True)
+    @patch('tarantism.connection.Connection')
+    def test_reconnect_in_child_process(self, connection_class):
+        connection_class.side_effect = lambda *args, **kwargs: Mock()
+        register_connection('test', host='127.0.0.1', port=33013)
+        parent_connection = get_connection('test')
+
+        with patch('os.getpid', return_value=os.getpid() + 1):
+            child_connection = get_connection('test')
+
+        self.assertIsNot(parent_connection, child_connection)
+        self.assertFalse(parent_connection.close.called)
+        self.assertEqual(os.getpid() + 1, connection_module._owner_pid)
+
+    @patch.dict('tarantism.connection._connection_settings', {}, clear=True)
+    @patch.dict('tarantism.connection._connections', {}, clear=True)
+    @patch.dict('tarantism.connection._spaces', {}, clear=True)
+    @patch('tarantism.connection.Connection')
+    def test_warm_up_fills_pool(self, connection_class):
+        connection_class.side_effect = lambda *args, **kwargs: Mock()
+        register_connection(
+            'test', host='127.0.0.1', port=33013, min_size=2, max_size=4
+        )
+
+        warm_up('test')
+
+        self.assertEqual(2, get_pool('test').idle_count)
+        self.assertEqual(2, connection_class.call_count)
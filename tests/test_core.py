@@ -0,0 +1,249 @@
+
+import socket
+from time import sleep
+from time import time
+
+import msgpack
+from tarantool.const import IPROTO_CODE, IPROTO_DATA, IPROTO_ERROR, IPROTO_SYNC
+from tarantool.const import REQUEST_TYPE_ERROR
+from tarantool.error import DatabaseError
+from tarantool.error import NetworkError
+
+from tarantism.core import AsyncConnection
+from tarantism.core import Connection
+from tarantism.core import Future
+from tarantism.exceptions import PipelineDiscarded
+from tarantism.exceptions import PipelineError
+from tarantism.exceptions import TimeoutError
+from tarantism.tests import TestCase
+
+
+def make_packet(sync, data=None, error=None):
+    if error is None:
+        header = {IPROTO_CODE: 0, IPROTO_SYNC: sync}
+        body = {IPROTO_DATA: data or []}
+    else:
+        header = {IPROTO_CODE: REQUEST_TYPE_ERROR | error[0], IPROTO_SYNC: sync}
+        body = {IPROTO_ERROR: error[1]}
+
+    return msgpack.dumps(header) + msgpack.dumps(body)
+
+
+class FakeSocket(object):
+    def __init__(self):
+        self.sent = []
+
+    def sendall(self, data):
+        self.sent.append(data)
+
+
+class StalledSocket(FakeSocket):
+    """Socket with ``packets`` ready, next one arrives after ``delay``."""
+    def __init__(self, packets, delay):
+        super(StalledSocket, self).__init__()
+        self.packets = packets
+        self.delay = delay
+        self.timeout = 10.0
+
+    def gettimeout(self):
+        return self.timeout
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def recv(self, size, flags=0):
+        if self.packets:
+            return self.packets[0][:size]
+
+        if self.timeout is not None and self.timeout < self.delay:
+            sleep(self.timeout)
+            raise socket.timeout('timed out')
+
+        raise AssertionError('Stalled read must time out.')
+
+
+class FakeAsyncConnection(AsyncConnection):
+    def __init__(self, packets):
+        super(FakeAsyncConnection, self).__init__(
+            'localhost', 0, connect_now=False
+        )
+        self._socket = FakeSocket()
+        self.packets = packets
+
+    def _opt_reconnect(self):
+        pass
+
+    def _read_response(self):
+        return self.packets.pop(0)
+
+
+class FutureTestCase(TestCase):
+    def test_then(self):
+        future = Future()
+        chained = future.then(lambda value: value + 1)
+
+        future.set_result(1)
+
+        self.assertTrue(chained.done())
+        self.assertEqual(2, chained.result())
+
+    def test_exception_propagates(self):
+        future = Future()
+        chained = future.then(lambda value: value + 1)
+
+        future.set_exception(ValueError())
+
+        with self.assertRaises(ValueError):
+            chained.result()
+
+
+class AsyncConnectionTestCase(TestCase):
+    def test_responses_matched_by_sync(self):
+        connection = FakeAsyncConnection([])
+
+        first = connection.submit('insert', 0, (1,))
+        second = connection.submit('insert', 0, (2,))
+
+        self.assertEqual(2, len(connection._socket.sent))
+
+        connection.packets.extend([
+            make_packet(last_sync(connection), [[2]]),
+            make_packet(last_sync(connection) - 1, [[1]]),
+        ])
+
+        self.assertEqual([[1]], first.result().data)
+        self.assertTrue(second.done())
+        self.assertEqual([[2]], second.result().data)
+
+    def test_error_delivered_to_future(self):
+        connection = FakeAsyncConnection([])
+
+        future = connection.submit('insert', 0, (1,))
+        connection.packets.append(
+            make_packet(last_sync(connection), error=(3, 'Duplicate key'))
+        )
+
+        with self.assertRaises(DatabaseError):
+            future.result()
+
+    def test_timeout_drops_pending(self):
+        connection = FakeAsyncConnection([])
+        future = connection.submit('insert', 0, (1,))
+        # Another thread is reading the socket.
+        connection._reading = True
+
+        with self.assertRaises(NetworkError):
+            future.result(timeout=0)
+
+        self.assertEqual({}, connection._pending)
+
+    def test_reader_timeout(self):
+        connection = FakeAsyncConnection([])
+        connection._socket = StalledSocket(connection.packets, delay=1.5)
+        other = connection.submit('insert', 0, (1,))
+        future = connection.submit('insert', 0, (2,))
+        # Response to unrelated request arrives, then server stalls.
+        connection.packets.append(make_packet(last_sync(connection) + 1, [[3]]))
+
+        started = time()
+        with self.assertRaises(TimeoutError):
+            future.result(timeout=0.1)
+
+        self.assertLess(time() - started, 1)
+        self.assertEqual(10.0, connection._socket.timeout)
+        self.assertEqual([other._sync], list(connection._pending))
+        self.assertFalse(connection._reading)
+
+    def test_cancel_drops_pending(self):
+        connection = FakeAsyncConnection([])
+        future = connection.submit('insert', 0, (1,)).then(lambda response: response)
+
+        self.assertTrue(future.cancel())
+        self.assertEqual({}, connection._pending)
+        with self.assertRaises(NetworkError):
+            future.result()
+
+
+def last_sync(connection):
+    return max(connection._pending)
+
+
+class FakePipelineConnection(Connection):
+    def __init__(self, packets):
+        super(FakePipelineConnection, self).__init__(
+            'localhost', 0, connect_now=False
+        )
+        self._socket = FakeSocket()
+        self.packets = packets
+
+    def _opt_reconnect(self):
+        pass
+
+    def _read_response(self):
+        return self.packets.pop(0)
+
+
+class PipelineTestCase(TestCase):
+    def test_batch_written_at_once(self):
+        connection = FakePipelineConnection([
+            make_packet(1, [[1]]), make_packet(2, [[2]])
+        ])
+
+        with connection.pipeline() as pipeline:
+            first = connection.insert(0, (1,))
+            second = connection.insert(0, (2,))
+
+            self.assertEqual([], connection._socket.sent)
+
+        self.assertEqual(1, len(connection._socket.sent))
+        self.assertEqual([[1]], first.result().data)
+        self.assertEqual([[2]], second.result().data)
+        self.assertEqual([], pipeline.errors)
+
+    def test_errors_exposed_per_item(self):
+        connection = FakePipelineConnection([
+            make_packet(1, error=(3, 'Duplicate key')), make_packet(2, [[2]])
+        ])
+
+        with self.assertRaises(PipelineError) as context:
+            with connection.pipeline():
+                connection.insert(0, (1,))
+                second = connection.insert(0, (2,))
+
+        self.assertEqual(0, context.exception.errors[0][0])
+        self.assertEqual([[2]], second.result().data)
+
+    def test_nothing_sent_on_exception(self):
+        connection = FakePipelineConnection([])
+
+        with self.assertRaises(ValueError):
+            with connection.pipeline():
+                connection.insert(0, (1,))
+                raise ValueError()
+
+        self.assertEqual([], connection._socket.sent)
+        self.assertIsNone(connection._pipeline)
+
+    def test_discarded_futures_fail(self):
+        connection = FakePipelineConnection([])
+
+        with self.assertRaises(ValueError):
+            with connection.pipeline():
+                future = connection.insert(0, (1,))
+                raise ValueError()
+
+        with self.assertRaises(PipelineDiscarded):
+            future.result()
+        self.assertEqual([], connection._socket.sent)
+
+    def test_nested_raise_on_error(self):
+        connection = FakePipelineConnection([
+            make_packet(1, error=(3, 'Duplicate key')), make_packet(2, [[2]])
+        ])
+
+        with connection.pipeline() as pipeline:
+            with connection.pipeline(raise_on_error=False):
+                connection.insert(0, (1,))
+            connection.insert(0, (2,))
+
+        self.assertEqual(0, pipeline.errors[0][0])
@@ -2,6 +2,7 @@
 
 from datetime import datetime
 from decimal import Decimal
+from uuid import UUID
 
 from tarantism import Model
 from tarantism import BaseField
@@ -16,8 +17,13 @@ from tarantism import INT32_MIN
 from tarantism import INT32_MAX
 from tarantism import INT64_MIN
 from tarantism import INT64_MAX
+from tarantism.fields import MsgpackField
+from tarantism.fields import UUIDField
+from tarantism.queryset import QuerySet
 from tarantism.tests import TestCase
 
+from tests.test_queryset import FakeSpace
+
 
 class BaseFieldTestCase(TestCase):
     def test_public(self):
@@ -243,6 +249,115 @@ class DateTimeFieldSerializationTestCase(TestCase):
         self.assertEqual(value_to_python, value)
 
 
+class DateTimeFieldEpochTestCase(TestCase):
+    def test_epoch_us(self):
+        value = datetime(2016, 3, 1, 12, 30, 15, 123456)
+        field = DateTimeField(storage='epoch_us')
+
+        value_to_db = field.to_db(value)
+
+        self.assertEqual(1456835415123456, value_to_db)
+        self.assertEqual(value, field.to_python(value_to_db))
+        self.assertEqual('unsigned', field.tarantool_index_type)
+
+    def test_epoch_ms(self):
+        value = datetime(2016, 3, 1, 12, 30, 15, 123456)
+        field = DateTimeField(storage='epoch_ms')
+
+        self.assertEqual(1456835415123, field.to_db(value))
+        self.assertEqual(
+            datetime(2016, 3, 1, 12, 30, 15, 123000),
+            field.to_python(field.to_db(value))
+        )
+
+    def test_ordering(self):
+        field = DateTimeField(storage='epoch_us')
+        earlier = datetime(2015, 12, 31, 23, 59, 59, 999999)
+        later = datetime(2016, 1, 1)
+
+        self.assertLess(field.to_db(earlier), field.to_db(later))
+
+    def test_empty(self):
+        field = DateTimeField(storage='epoch_us')
+
+        self.assertIsNone(field.to_db(None))
+        self.assertIsNone(field.to_python(None))
+
+    def test_legacy_string(self):
+        field = DateTimeField(storage='epoch_us')
+
+        self.assertEqual(
+            datetime(2016, 3, 1, 12, 30, 15, 123456),
+            field.to_python('2016-03-01 12:30:15.123456')
+        )
+        self.assertIsNone(field.to_python(''))
+
+    def test_before_epoch(self):
+        field = DateTimeField(storage='epoch_us')
+
+        with self.assertRaises(ValidationError):
+            field.validate(datetime(1969, 12, 31))
+
+    def test_unknown_storage(self):
+        with self.assertRaises(ValueError):
+            DateTimeField(storage='epoch_ns')
+
+
+class BinaryUUIDFieldTestCase(TestCase):
+    def setUp(self):
+        self.value = '6f1e0e52-4c8f-4d47-9f5e-0c7b7e1b2a3d'
+        self.field = UUIDField(binary=True)
+
+    def test_serialization(self):
+        value_to_db = self.field.to_db(self.value)
+
+        self.assertEqual(UUID(self.value).bytes, value_to_db)
+        self.assertEqual(self.value, self.field.to_python(value_to_db))
+
+    def test_uuid_value(self):
+        self.field.validate(UUID(self.value))
+
+        self.assertEqual(UUID(self.value).bytes, self.field.to_db(UUID(self.value)))
+        self.assertEqual(UUID(self.value).bytes, self.field.to_db(unicode(self.value)))
+
+    def test_filter_by_string(self):
+        class Record(Model):
+            pk = UUIDField(binary=True, primary_key=True)
+
+        space = FakeSpace([])
+        list(QuerySet(Record, space).filter(pk=self.value))
+
+        key, kwargs = space.requests[0]
+        self.assertEqual(UUID(self.value).bytes, key)
+
+    def test_string_storage(self):
+        self.assertEqual(self.value, UUIDField().to_db(UUID(self.value)))
+
+    def test_legacy_string_loaded(self):
+        self.assertEqual(self.value, self.field.to_python(self.value))
+        self.assertEqual(self.value, self.field.to_python(self.value.upper()))
+
+
+class MsgpackFieldTestCase(TestCase):
+    def test_native(self):
+        field = MsgpackField()
+        value = {u'sentiment': u'positive', u'scores': [0.5, 0.25]}
+
+        self.assertIs(value, field.to_db(value))
+        self.assertIs(value, field.to_python(value))
+
+    def test_legacy_json(self):
+        field = MsgpackField()
+
+        self.assertEqual({u'a': [1, 2]}, field.to_python('{"a": [1, 2]}'))
+
+    def test_fail_on_invalid_type(self):
+        field = MsgpackField()
+
+        self.assertIsNone(field.validate([1, 2]))
+        self.assertRaises(ValidationError, field.validate, u'{}')
+
+
 class DecimalFieldSerializationTestCase(TestCase):
     def test_base(self):
         value = Decimal('1.01')
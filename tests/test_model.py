@@ -1,7 +1,20 @@
+from contextlib import contextmanager
+from uuid import UUID
 
+from mock import MagicMock
+from mock import Mock
+from mock import call
+
+from tarantism import DateTimeField
 from tarantism import Model
 from tarantism import Num64Field
 from tarantism import StringField
+from tarantism import ValidationError
+from tarantism.fields import DictField
+from tarantism.fields import JsonField
+from tarantism.fields import UUIDField
+from tarantism.migrations import migrate_datetime_to_epoch
+from tarantism.migrations import migrate_uuid_to_binary
 from tarantism.tests import TestCase
 
 
@@ -136,3 +149,472 @@ class ModelDictLikeTestCase(TestCase):
 
         with self.assertRaises(KeyError):
             r['not_defined_field'] = 1L
+
+
+class FakeIndexesConnection(object):
+    schema_version = 1
+
+    def __init__(self):
+        self.calls = 0
+
+    @contextmanager
+    def unpipelined(self):
+        yield
+
+    def call(self, func_name, space_name):
+        self.calls += 1
+        return [[{
+            0: {'name': 'primary', 'parts': [{'fieldno': 1}]},
+            1: {'name': 'pk_data', 'parts': [{'fieldno': 1}, {'fieldno': 2}]},
+            'primary': {},
+        }]]
+
+
+class ModelIndexesCacheTestCase(TestCase):
+    def setUp(self):
+        connection = self.connection = FakeIndexesConnection()
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+
+            meta = {'space': 'records'}
+
+            @classmethod
+            def space(cls):
+                return Mock(connection=connection)
+
+        self.Record = Record
+
+    def test_loaded_once(self):
+        self.assertEqual(['pk', 'data'], self.Record.indexes()[1]['fields'])
+        self.Record.indexes()
+
+        self.assertEqual(1, self.connection.calls)
+
+    def test_index_for_fields(self):
+        self.assertEqual('pk_data', self.Record.index_for_fields('pk', 'data')['name'])
+        self.assertEqual(0, self.Record.index_for_fields('pk')['id'])
+        self.assertIsNone(self.Record.index_for_fields('data'))
+
+    def test_invalidate(self):
+        self.Record.indexes()
+        self.Record.invalidate_indexes()
+        self.Record.indexes()
+
+        self.assertEqual(2, self.connection.calls)
+
+    def test_schema_version_changed(self):
+        self.Record.indexes()
+        self.connection.schema_version = 2
+        self.Record.indexes()
+        self.Record.indexes()
+
+        self.assertEqual(2, self.connection.calls)
+
+    def test_older_schema_version_ignored(self):
+        self.connection.schema_version = 2
+        self.Record.indexes()
+        # Other connection of the pool has not seen the change yet.
+        self.connection.schema_version = 1
+        self.Record.indexes()
+
+        self.assertEqual(1, self.connection.calls)
+
+    def test_index_info_copy(self):
+        info = self.Record.index_info('pk_data')
+        info['name'] = 'changed'
+
+        self.assertEqual('pk_data', self.Record.index_info(1)['name'])
+
+    def test_ttl(self):
+        self.Record._meta['indexes_ttl'] = 0
+        self.Record.indexes()
+        self.Record.indexes()
+
+        self.assertEqual(2, self.connection.calls)
+
+
+class ModelCodecTestCase(TestCase):
+    def test_decode(self):
+        class Record(Model):
+            pk = Num64Field()
+            data = StringField(default=u'default')
+
+        r = Record._decode([1, None])
+
+        self.assertEqual(1L, r.pk)
+        self.assertEqual(u'default', r.data)
+        self.assertTrue(r.exists_in_db)
+
+        r = Record._decode(['1', 'test'])
+
+        self.assertEqual(1L, r.pk)
+        self.assertEqual(u'test', r.data)
+
+    def test_decode_short_tuple(self):
+        class Record(Model):
+            pk = Num64Field()
+            data = StringField()
+
+        r = Record._decode([1])
+
+        self.assertEqual(1L, r.pk)
+        self.assertIsNone(r.data)
+
+    def test_decode_custom_init(self):
+        class Record(Model):
+            pk = Num64Field()
+
+            def __init__(self, **kwargs):
+                super(Record, self).__init__(**kwargs)
+                self.initialized = True
+
+        self.assertTrue(Record._decode([1]).initialized)
+
+    def test_encode(self):
+        class Record(Model):
+            pk = Num64Field()
+            data = StringField()
+
+        self.assertEqual((1L, 'test'), Record(pk=1L, data=u'test')._encode())
+
+
+class ModelCompactTestCase(TestCase):
+    def setUp(self):
+        class Record(Model):
+            pk = Num64Field()
+            data = StringField(default=u'default')
+
+            meta = {'compact': True}
+
+        self.Record = Record
+
+    def test_no_dict(self):
+        r = self.Record(pk=1L)
+
+        self.assertFalse(hasattr(r, '__dict__'))
+        self.assertEqual([1L, u'default'], r._values)
+
+        with self.assertRaises(AttributeError):
+            r.extra = 1
+
+    def test_access(self):
+        r = self.Record(pk=1L)
+        r.data = u'test'
+        r['pk'] = 2L
+
+        self.assertEqual(2L, r.pk)
+        self.assertEqual({'pk': 2L, 'data': u'test'}, r._data)
+        self.assertIs(self.Record._fields['pk'], self.Record.pk)
+
+    def test_codec(self):
+        r = self.Record._decode([1, 'test'])
+
+        self.assertEqual(u'test', r.data)
+        self.assertTrue(r.exists_in_db)
+        self.assertEqual((1L, 'test'), r._encode())
+
+
+class ModelDirtyFieldsTestCase(TestCase):
+    def setUp(self):
+        space = self.space = Mock()
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+            details = DictField()
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+        self.Record = Record
+
+    def test_nothing_changed(self):
+        r = self.Record._decode([1, 'test', {}])
+
+        self.assertIs(r, r.save())
+        self.assertFalse(self.space.update.called)
+
+    def test_changed_fields_only(self):
+        r = self.Record._decode([1, 'test', {}])
+        r.data = u'new'
+
+        r.save()
+
+        self.space.update.assert_called_once_with(1L, [('=', 1, 'new')])
+
+        r.save()
+
+        self.assertEqual(1, self.space.update.call_count)
+
+    def test_mutable_field_read(self):
+        r = self.Record._decode([1, 'test', {}])
+        r.details['key'] = 'value'
+
+        r.save()
+
+        self.space.update.assert_called_once_with(
+            1L, [('=', 2, {'key': 'value'})]
+        )
+
+    def test_mutable_field_read_unchanged(self):
+        r = self.Record._decode([1, 'test', {'key': 'value'}])
+
+        self.assertEqual('value', r.details['key'])
+        r.save()
+
+        self.assertFalse(self.space.update.called)
+
+    def test_mutable_field_changed_after_save(self):
+        r = self.Record._decode([1, 'test', {}])
+        details = r.details
+        details['key'] = 'value'
+        r.save()
+
+        details['key'] = 'other'
+        r.save()
+        r.save()
+
+        self.assertEqual(2, self.space.update.call_count)
+        self.space.update.assert_called_with(1L, [('=', 2, {'key': 'other'})])
+
+    def test_encoded_mutable_field_read(self):
+        space = self.space
+        encoded = []
+
+        class TracingField(JsonField):
+            def to_db(self, value):
+                encoded.append(value)
+                return super(TracingField, self).to_db(value)
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            details = TracingField()
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+        r = Record._decode([1, '{"key":"value"}'])
+        self.assertEqual('value', r.details['key'])
+        self.assertEqual([], encoded)
+
+        r.save()
+        self.assertFalse(space.update.called)
+
+        r.details['key'] = 'other'
+        r.save()
+        space.update.assert_called_once_with(1L, [('=', 1, '{"key":"other"}')])
+
+    def test_mutable_field_updated_not_saved_again(self):
+        r = self.Record._decode([1, 'test', {}])
+        r.update(details={'key': 'value'})
+
+        self.assertEqual('value', r.details['key'])
+        r.save()
+
+        self.assertEqual(1, self.space.update.call_count)
+
+    def test_compact_mutable_field_read_unchanged(self):
+        space = self.space
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            details = DictField()
+
+            meta = {'compact': True}
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+        r = Record._decode([1, {'key': 'value'}])
+        r.details.get('key')
+        r.save()
+
+        self.assertFalse(space.update.called)
+
+        r.details['key'] = 'other'
+        r.save()
+
+        space.update.assert_called_once_with(1L, [('=', 1, {'key': 'other'})])
+
+    def test_insert(self):
+        r = self.Record(pk=1L, data=u'test')
+
+        r.save()
+        r.save()
+
+        self.space.insert.assert_called_once_with((1L, 'test', {}))
+        self.assertFalse(self.space.update.called)
+
+
+class ModelUpsertTestCase(TestCase):
+    def test_upsert(self):
+        space = Mock()
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            hits = Num64Field()
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+        r = Record(pk=1L, hits=1L)
+        r.upsert(hits__add=1)
+
+        space.upsert.assert_called_once_with((1L, 1L), [('+', 1, 1)])
+        self.assertTrue(r.exists_in_db)
+        self.assertIs(r, r.save())
+
+    def test_upsert_validates(self):
+        space = Mock()
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True, required=True)
+            hits = Num64Field()
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+        with self.assertRaises(ValidationError):
+            Record(hits=1L).upsert(hits__add=1)
+
+        self.assertFalse(space.upsert.called)
+
+
+class ModelLazyTestCase(TestCase):
+    def setUp(self):
+        self.decoded = decoded = []
+
+        class TracingField(StringField):
+            def to_python(self, value):
+                decoded.append(self.name)
+                return super(TracingField, self).to_python(value)
+
+        space = self.space = Mock()
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = TracingField()
+            details = DictField()
+
+            meta = {'lazy': True}
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+        self.Record = Record
+
+    def test_decoded_on_access(self):
+        r = self.Record._decode([1, 'test', {}])
+
+        self.assertEqual([], self.decoded)
+        self.assertEqual(1L, r.pk)
+        self.assertEqual(u'test', r.data)
+        self.assertEqual(u'test', r.data)
+        self.assertEqual(['data'], self.decoded)
+
+    def test_save_changed_field(self):
+        r = self.Record._decode([1, 'test', {'key': 'value'}])
+        r.pk = 1L
+
+        r.save()
+
+        self.space.update.assert_called_once_with(1L, [('=', 0, 1L)])
+        self.assertEqual([], self.decoded)
+        self.assertEqual(['pk'], sorted(r._decoded))
+
+    def test_validate_decoded_fields(self):
+        r = self.Record._decode([1, 'test', {}])
+        r.data = 1
+
+        with self.assertRaises(ValidationError):
+            r.save()
+
+    def test_new_model(self):
+        r = self.Record(pk=1L, data=u'test')
+
+        r.save()
+
+        self.space.insert.assert_called_once_with((1L, 'test', {}))
+
+    def test_not_compact(self):
+        with self.assertRaises(ValueError):
+            class Record(Model):
+                pk = Num64Field()
+
+                meta = {'lazy': True, 'compact': True}
+
+
+class MigrateDateTimeToEpochTestCase(TestCase):
+    def test_migrate(self):
+        space = MagicMock()
+        space.select.side_effect = [
+            [[1, '2016-03-01 12:30:15.123456'], [2, 1456835415123456]],
+            [[3, '']],
+        ]
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            created_at = DateTimeField(storage='epoch_us')
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+            @classmethod
+            def indexes(cls):
+                return {0: {'name': 'primary', 'parts': [{'fieldno': 1}]}}
+
+        updated = migrate_datetime_to_epoch(Record, 'created_at', batch_size=2)
+
+        self.assertEqual(2, updated)
+        self.assertEqual(
+            [call([1], [('=', 1, 1456835415123456)]), call([3], [('=', 1, None)])],
+            space.update.call_args_list
+        )
+        self.assertEqual([2], space.select.call_args_list[1][0][0])
+
+
+class MigrateUUIDToBinaryTestCase(TestCase):
+    def setUp(self):
+        space = self.space = MagicMock()
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            external_id = UUIDField(binary=True)
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+            @classmethod
+            def indexes(cls):
+                return {0: {'name': 'primary', 'parts': [{'fieldno': 1}]}}
+
+        self.Record = Record
+
+    def test_migrate(self):
+        value = '6f1e0e52-4c8f-4d47-9f5e-0c7b7e1b2a3d'
+        self.space.select.side_effect = [
+            [[1, value], [2, UUID(value).bytes], [3, None]],
+        ]
+
+        updated = migrate_uuid_to_binary(self.Record, 'external_id')
+
+        self.assertEqual(1, updated)
+        self.space.update.assert_called_once_with(
+            [1], [('=', 1, UUID(value).bytes)]
+        )
+
+    def test_string_storage_rejected(self):
+        self.Record._fields['external_id'].binary = False
+
+        with self.assertRaises(ValueError):
+            migrate_uuid_to_binary(self.Record, 'external_id')
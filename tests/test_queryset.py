@@ -0,0 +1,689 @@
+from contextlib import contextmanager
+
+from mock import Mock
+
+from tarantool.const import ITERATOR_GE
+from tarantool.const import ITERATOR_GT
+from tarantool.const import ITERATOR_LE
+from tarantool.const import ITERATOR_LT
+from tarantool.const import ITERATOR_REQ
+
+from tarantism import Model
+from tarantism import FieldError
+from tarantism import Num64Field
+from tarantism import StringField
+from tarantism import ValidationError
+from tarantism.core import Space
+from tarantism.fields import DictField
+from tarantism.queryset import ORDER_DESC
+from tarantism.queryset import QuerySet
+from tarantism.tests import TestCase
+
+from tests.test_core import FakePipelineConnection
+from tests.test_core import make_packet
+
+
+class FakeConnection(FakePipelineConnection):
+    def space_no(self, space_name):
+        return space_name
+
+
+def make_queryset(model_class, packets):
+    connection = FakeConnection(packets)
+    return QuerySet(model_class, Space(connection, 0))
+
+
+class BulkCreateTestCase(TestCase):
+    def test_batches(self):
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+
+        queryset = make_queryset(Record, [
+            make_packet(sync, [[sync, 'test']]) for sync in range(1, 6)
+        ])
+        records = [Record(pk=pk, data=u'test') for pk in range(1, 6)]
+
+        failed = queryset.bulk_create(iter(records), batch_size=2)
+
+        self.assertEqual([], failed)
+        self.assertEqual(3, len(queryset.space.connection._socket.sent))
+        self.assertTrue(all(r.exists_in_db for r in records))
+
+    def test_failed_rows_reported(self):
+        class Record(Model):
+            pk = Num64Field(primary_key=True, required=True)
+            data = StringField()
+
+        queryset = make_queryset(Record, [
+            make_packet(1, error=(3, 'Duplicate key')),
+            make_packet(2, [[2, 'test']]),
+        ])
+        duplicate = Record(pk=1L, data=u'test')
+        invalid = Record(data=u'test')
+        valid = Record(pk=2L, data=u'test')
+
+        failed = queryset.bulk_create([duplicate, invalid, valid])
+
+        self.assertEqual(
+            [invalid, duplicate], [model for model, _ in failed]
+        )
+        self.assertIsInstance(failed[0][1], ValidationError)
+        self.assertTrue(valid.exists_in_db)
+        self.assertFalse(duplicate.exists_in_db)
+
+    def test_inside_outer_pipeline(self):
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+
+        queryset = make_queryset(Record, [
+            make_packet(1, [[9, 'other']]),
+            make_packet(2, error=(3, 'Duplicate key')),
+            make_packet(3, [[2, 'test']]),
+        ])
+        duplicate = Record(pk=1L, data=u'test')
+        valid = Record(pk=2L, data=u'test')
+
+        with queryset.space.connection.pipeline():
+            queryset.space.insert((9L, 'other'))
+            failed = queryset.bulk_create([duplicate, valid])
+
+        self.assertEqual([duplicate], [model for model, _ in failed])
+        self.assertFalse(duplicate.exists_in_db)
+        self.assertTrue(valid.exists_in_db)
+
+    def test_encode_error_reported(self):
+        class BrokenField(StringField):
+            def to_db(self, value):
+                raise ValueError(value)
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = BrokenField()
+
+        queryset = make_queryset(Record, [])
+        broken = Record(pk=1L, data=u'test')
+
+        failed = queryset.bulk_create([broken], validate=False)
+
+        self.assertEqual([broken], [model for model, _ in failed])
+        self.assertIsInstance(failed[0][1], ValueError)
+
+    def test_bulk_upsert(self):
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            hits = Num64Field()
+
+        queryset = make_queryset(Record, [
+            make_packet(sync, []) for sync in range(1, 4)
+        ])
+        records = [Record(pk=pk, hits=1L) for pk in range(1, 4)]
+
+        failed = queryset.bulk_upsert(records, {'hits__add': 1})
+
+        self.assertEqual([], failed)
+        self.assertEqual(1, len(queryset.space.connection._socket.sent))
+        self.assertTrue(all(r.exists_in_db for r in records))
+
+
+class PipelineReadTestCase(TestCase):
+    def test_get_inside_pipeline(self):
+        connection = FakeConnection([
+            make_packet(2, [[1, 'test']]), make_packet(1, [[2, 'new']])
+        ])
+        space = Space(connection, 0)
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+        with Record.pipeline():
+            Record(pk=2L, data=u'new').save()
+            record = Record.objects().get(pk=1L)
+
+            self.assertEqual(u'test', record.data)
+            self.assertEqual(1, len(connection._socket.sent))
+
+        self.assertEqual(2, len(connection._socket.sent))
+
+
+class FakeSpace(object):
+    name = 'records'
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = []
+
+    def select(self, key, **kwargs):
+        self.requests.append((key, kwargs))
+        offset = kwargs.get('offset', 0)
+        return self.rows[offset:offset + kwargs.get('limit')]
+
+
+class LazyQuerySetTestCase(TestCase):
+    def setUp(self):
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+
+        self.space = FakeSpace([[pk, 'test'] for pk in range(10)])
+        self.queryset = QuerySet(Record, self.space)
+
+    def test_lazy(self):
+        queryset = self.queryset.filter(pk=1L).limit(5)
+
+        self.assertEqual([], self.space.requests)
+
+        self.assertEqual(5, len(queryset))
+        list(queryset)
+
+        self.assertEqual(1, len(self.space.requests))
+
+    def test_slicing(self):
+        records = self.queryset.all()[2:5]
+
+        self.assertEqual([2, 3, 4], [r.pk for r in records])
+        key, kwargs = self.space.requests[0]
+        self.assertEqual(2, kwargs['offset'])
+        self.assertEqual(3, kwargs['limit'])
+
+    def test_index(self):
+        self.assertEqual(3, self.queryset.offset(1)[2].pk)
+
+        with self.assertRaises(IndexError):
+            self.queryset.all()[20]
+
+    def test_iterator(self):
+        records = list(self.queryset.all().iterator(chunk_size=4))
+
+        self.assertEqual(range(10), [r.pk for r in records])
+        self.assertEqual(3, len(self.space.requests))
+
+    def test_order_desc(self):
+        list(self.queryset.filter(pk=1L).order('desc'))
+
+        key, kwargs = self.space.requests[0]
+        self.assertEqual(ITERATOR_REQ, kwargs['iterator'])
+
+        with self.assertRaises(ValueError):
+            self.queryset.order('random')
+
+
+class ProjectionTestCase(TestCase):
+    def setUp(self):
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+            details = DictField()
+
+        self.space = FakeSpace([[1, 'first', {}], [2, 'second', {}]])
+        self.queryset = QuerySet(Record, self.space)
+
+    def test_values(self):
+        self.assertEqual(
+            [{'pk': 1L, 'data': u'first'}, {'pk': 2L, 'data': u'second'}],
+            list(self.queryset.all().values('pk', 'data'))
+        )
+
+    def test_values_list(self):
+        self.assertEqual(
+            [(u'first', 1L), (u'second', 2L)],
+            list(self.queryset.all().values_list('data', 'pk'))
+        )
+        self.assertEqual(
+            [1L, 2L], list(self.queryset.all().values_list('pk', flat=True))
+        )
+
+        with self.assertRaises(ValueError):
+            self.queryset.values_list('pk', 'data', flat=True)
+
+    def test_unknown_field(self):
+        with self.assertRaises(FieldError):
+            list(self.queryset.all().values('unknown'))
+
+    def test_only(self):
+        record = self.queryset.filter(pk=1L).only('pk', 'data')[0]
+
+        self.assertEqual(u'first', record.data)
+        self.assertIsNone(record.details)
+        self.assertTrue(record.exists_in_db)
+
+        record.data = u'new'
+        self.assertEqual({'data': 'new'}, record._dirty_to_db())
+
+        record.details = {'key': 'value'}
+        self.assertEqual(
+            {'data': 'new', 'details': {'key': 'value'}}, record._dirty_to_db()
+        )
+
+    def test_only_save_required_deferred(self):
+        space = Mock()
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+            note = StringField(required=True)
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+        queryset = QuerySet(Record, FakeSpace([[1, 'first', 'note']]))
+        record = queryset.filter(pk=1L).only('pk', 'data')[0]
+        record.data = u'new'
+        record.save()
+
+        space.update.assert_called_once_with(1L, [('=', 1, 'new')])
+
+        record.note = None
+        with self.assertRaises(ValidationError):
+            record.save()
+
+
+class CachedQuerySetTestCase(TestCase):
+    def setUp(self):
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+
+            meta = {'cache': {'max_size': 10}}
+
+        self.Record = Record
+        self.space = FakeSpace([[1, 'test']])
+        self.queryset = QuerySet(Record, self.space)
+
+    def test_get_cached(self):
+        first = self.queryset.get(pk=1L)
+        second = self.queryset.get(pk=1L)
+
+        self.assertEqual(1, len(self.space.requests))
+        self.assertIsNot(first, second)
+        self.assertEqual(u'test', second.data)
+        self.assertEqual(1, self.Record.get_cache().hits)
+
+    def test_not_primary_key(self):
+        list(self.queryset.all())
+        list(self.queryset.all())
+
+        self.assertEqual(2, len(self.space.requests))
+
+    def test_invalidated_on_delete(self):
+        record = self.queryset.get(pk=1L)
+        record.get_space = lambda: FakeDeleteSpace()
+        record.delete()
+
+        self.queryset.get(pk=1L)
+
+        self.assertEqual(2, len(self.space.requests))
+
+    def test_write_during_read_not_cached(self):
+        cache = self.Record.get_cache()
+        select = self.space.select
+
+        def racing_select(key, **kwargs):
+            rows = select(key, **kwargs)
+            cache.invalidate(1L)
+            return rows
+
+        self.space.select = racing_select
+        self.queryset.get(pk=1L)
+
+        self.assertIsNone(cache.get(1L))
+
+    def test_composite_primary_key(self):
+        with self.assertRaises(ValueError):
+            class Record(Model):
+                pk = Num64Field(primary_key=True)
+                data = StringField(db_index=0)
+
+                meta = {'cache': {'max_size': 10}}
+
+
+class FakeDeleteSpace(object):
+    def delete(self, key):
+        return Mock(rowcount=1)
+
+
+class FakeTreeSpace(FakeSpace):
+    """Space over rows sorted by (group, pk) TREE index."""
+    def select(self, key, **kwargs):
+        self.requests.append((key, kwargs))
+        rows = sorted(self.rows)
+        iterator = kwargs['iterator']
+        if iterator in (ITERATOR_LE, ITERATOR_LT):
+            rows.reverse()
+
+        def matches(row):
+            row_key = row[:len(key)]
+            return {
+                ITERATOR_GE: row_key >= key, ITERATOR_GT: row_key > key,
+                ITERATOR_LE: row_key <= key, ITERATOR_LT: row_key < key,
+            }[iterator]
+
+        offset = kwargs.get('offset', 0)
+        return [row for row in rows if matches(row)][offset:offset + kwargs['limit']]
+
+
+class PaginateTestCase(TestCase):
+    def setUp(self):
+        class Record(Model):
+            group = Num64Field(db_index=1)
+            pk = Num64Field(primary_key=True)
+
+            @classmethod
+            def indexes(cls):
+                return {1: {
+                    'name': 'group_pk', 'type': 'TREE', 'unique': True,
+                    'parts': [{'fieldno': 1}, {'fieldno': 2}],
+                    'fields': ['group', 'pk'],
+                }}
+
+        rows = [[group, pk] for group in (1, 2) for pk in range(5)]
+        self.queryset = QuerySet(Record, FakeTreeSpace(rows))
+
+    def test_pages(self):
+        pages = []
+        cursor = None
+        while True:
+            page, cursor = self.queryset.paginate('group_pk', after=cursor, page_size=3)
+            pages.append([(r.group, r.pk) for r in page])
+            if cursor is None:
+                break
+
+        self.assertEqual(4, len(pages))
+        self.assertEqual([(1, 0), (1, 1), (1, 2)], pages[0])
+        self.assertEqual([(2, 4)], pages[-1])
+
+    def test_filtered_descending(self):
+        queryset = self.queryset.filter(group=1L).order('desc')
+
+        page, cursor = queryset.paginate(1, page_size=3)
+        self.assertEqual([4, 3, 2], [r.pk for r in page])
+
+        page, cursor = queryset.paginate(1, after=cursor, page_size=3)
+        self.assertEqual([1, 0], [r.pk for r in page])
+        self.assertIsNone(cursor)
+
+    def test_stream(self):
+        records = list(self.queryset.stream(batch_size=3, index='group_pk'))
+
+        self.assertEqual(10, len(records))
+        self.assertEqual(4, len(self.queryset.space.requests))
+
+        key, kwargs = self.queryset.space.requests[1]
+        self.assertEqual([1, 2], key)
+        self.assertEqual(ITERATOR_GT, kwargs['iterator'])
+
+    def test_stream_filtered_limited(self):
+        queryset = self.queryset.filter(group=2L).limit(4)
+
+        records = list(queryset.stream(batch_size=3))
+
+        self.assertEqual([(2, pk) for pk in range(4)], [(r.group, r.pk) for r in records])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.queryset.paginate(1, after='not-a-cursor')
+
+    def test_last_page_full(self):
+        queryset = self.queryset.filter(group=1L)
+
+        page, cursor = queryset.paginate(1, page_size=5)
+
+        self.assertEqual(5, len(page))
+        self.assertIsNone(cursor)
+
+
+class NonUniquePaginateTestCase(TestCase):
+    def setUp(self):
+        class Record(Model):
+            group = Num64Field(db_index=1)
+            pk = Num64Field(primary_key=True)
+
+            @classmethod
+            def indexes(cls):
+                return {
+                    0: {'name': 'primary', 'type': 'TREE', 'unique': True,
+                        'parts': [{'fieldno': 2}], 'fields': ['pk']},
+                    1: {'name': 'group', 'type': 'TREE', 'unique': False,
+                        'parts': [{'fieldno': 1}], 'fields': ['group']},
+                }
+
+        rows = [[group, pk] for group in (1, 2) for pk in range(5)]
+        self.queryset = QuerySet(Record, FakeTreeSpace(rows))
+
+    def test_stream_duplicates_across_batches(self):
+        records = list(self.queryset.stream(batch_size=3, index='group'))
+
+        self.assertEqual(
+            [(group, pk) for group in (1, 2) for pk in range(5)],
+            [(r.group, r.pk) for r in records]
+        )
+
+    def test_stream_skips_more_than_batch(self):
+        records = list(self.queryset.stream(batch_size=2, index='group'))
+
+        self.assertEqual(10, len(records))
+        self.assertEqual(len(records), len(set((r.group, r.pk) for r in records)))
+
+    def test_paginate_descending(self):
+        queryset = self.queryset.order('desc')
+
+        page, cursor = queryset.paginate('group', page_size=4)
+        self.assertEqual([(2, 4), (2, 3), (2, 2), (2, 1)], [(r.group, r.pk) for r in page])
+
+        page, cursor = queryset.paginate('group', after=cursor, page_size=4)
+        self.assertEqual([(2, 0), (1, 4), (1, 3), (1, 2)], [(r.group, r.pk) for r in page])
+
+        page, cursor = queryset.paginate('group', after=cursor, page_size=4)
+        self.assertEqual([(1, 1), (1, 0)], [(r.group, r.pk) for r in page])
+        self.assertIsNone(cursor)
+
+
+class FakeResponse(object):
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeEvalConnection(object):
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = []
+
+    @contextmanager
+    def unpipelined(self):
+        yield
+
+    def eval(self, expr, args):
+        self.requests.append(args)
+        return FakeResponse([self.rows])
+
+
+class MultiFilterTestCase(TestCase):
+    def setUp(self):
+        class Record(Model):
+            group = Num64Field(db_index=1)
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+            note = StringField()
+
+            @classmethod
+            def indexes(cls):
+                return {
+                    0: {'name': 'primary', 'fields': ['pk']},
+                    1: {'name': 'group_pk', 'fields': ['group', 'pk']},
+                }
+
+        self.space = FakeSpace([[1, 1, 'test', '']])
+        self.space.connection = FakeEvalConnection([[1, 2, 'test', '']])
+        self.queryset = QuerySet(Record, self.space)
+
+    def test_full_index_prefix(self):
+        records = list(self.queryset.filter(group=1L, pk=1L))
+
+        self.assertEqual([1], [r.pk for r in records])
+        key, kwargs = self.space.requests[0]
+        self.assertEqual([1, 1], key)
+        self.assertEqual(1, kwargs['index'])
+        self.assertEqual([], self.space.connection.requests)
+
+    def test_residual_filter(self):
+        records = list(self.queryset.filter(group=1L).filter(data=u'test'))
+
+        self.assertEqual([2], [r.pk for r in records])
+        self.assertEqual([], self.space.requests)
+        space, index, key, _, _, _, filters = self.space.connection.requests[0]
+        self.assertEqual(1, index)
+        self.assertEqual([1], key)
+        self.assertEqual({3: 'test'}, filters)
+
+    def test_no_usable_index(self):
+        with self.assertRaises(FieldError):
+            self.queryset.filter(data=u'test', note=u'')
+
+        self.assertEqual([], self.space.connection.requests)
+
+    def test_single_not_indexed_condition(self):
+        with self.assertRaises(FieldError):
+            self.queryset.filter(data=u'test')
+
+    def test_partial_hash_key_not_used(self):
+        self.queryset.model_class.indexes = classmethod(lambda cls: {
+            0: {'name': 'primary', 'type': 'HASH', 'fields': ['pk']},
+            1: {'name': 'group_pk', 'type': 'HASH', 'fields': ['group', 'pk']},
+            2: {'name': 'data', 'fields': ['data']},
+        })
+
+        list(self.queryset.filter(group=1L, data=u'test'))
+
+        space, index, key, _, _, _, filters = self.space.connection.requests[0]
+        self.assertEqual(2, index)
+        self.assertEqual(['test'], key)
+        self.assertEqual({1: 1}, filters)
+
+    def test_partial_hash_key_only(self):
+        self.queryset.model_class.indexes = classmethod(lambda cls: {
+            0: {'name': 'primary', 'type': 'HASH', 'fields': ['pk']},
+            1: {'name': 'group_pk', 'type': 'HASH', 'fields': ['group', 'pk']},
+        })
+
+        with self.assertRaises(FieldError):
+            self.queryset.filter(group=1L, data=u'test')
+
+    def test_paginate_rejects_filters(self):
+        with self.assertRaises(ValueError):
+            self.queryset.filter(group=1L, data=u'test').paginate(1)
+
+
+class FakeBulkConnection(object):
+    """Returns rows whose index values match requested keys."""
+    def __init__(self, rows, field_numbers):
+        self.rows = rows
+        self.field_numbers = field_numbers
+        self.requests = []
+
+    @contextmanager
+    def unpipelined(self):
+        yield
+
+    def eval(self, expr, args):
+        self.requests.append(args)
+        space, index, keys = args
+        numbers = self.field_numbers[index]
+
+        return FakeResponse([[
+            row for row in self.rows
+            if [row[i] for i in numbers] in keys
+        ]])
+
+
+class InBulkTestCase(TestCase):
+    def setUp(self):
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            group = Num64Field(db_index=1)
+            data = StringField()
+
+            meta = {'cache': {'max_size': 10}}
+
+            @classmethod
+            def indexes(cls):
+                return {
+                    0: {'id': 0, 'name': 'primary', 'fields': ['pk'],
+                        'parts': [{'fieldno': 1}]},
+                    1: {'id': 1, 'name': 'group_data', 'fields': ['group', 'data'],
+                        'parts': [{'fieldno': 2}, {'fieldno': 3}],
+                        'unique': True},
+                    2: {'id': 2, 'name': 'group', 'fields': ['group'],
+                        'parts': [{'fieldno': 2}], 'unique': False},
+                }
+
+        self.space = FakeSpace([])
+        self.space.connection = FakeBulkConnection(
+            [[pk, pk % 2, u'test %d' % pk] for pk in range(1, 6)],
+            {0: [0], 1: [1, 2]}
+        )
+        self.queryset = QuerySet(Record, self.space)
+        self.model_class = Record
+
+    def tearDown(self):
+        self.model_class._cache.clear()
+
+    def test_missing_keys(self):
+        records = self.queryset.in_bulk([1L, 7L, 3L, 1L])
+
+        self.assertEqual([1L, 3L, 7L], sorted(records))
+        self.assertEqual(1, records[1L].pk)
+        self.assertEqual(u'test 3', records[3L].data)
+        self.assertIsNone(records[7L])
+        self.assertEqual(1, len(self.space.connection.requests))
+
+    def test_batches(self):
+        records = self.queryset.in_bulk(range(1, 6), batch_size=2)
+
+        self.assertEqual(5, len(records))
+        self.assertEqual(3, len(self.space.connection.requests))
+
+    def test_cached(self):
+        self.queryset.in_bulk([1L, 2L])
+        records = self.queryset.in_bulk([1L, 2L, 3L])
+
+        self.assertEqual(2, records[2L].pk)
+        self.assertEqual([[3]], self.space.connection.requests[-1][2])
+
+    def test_secondary_index(self):
+        records = self.queryset.in_bulk(
+            [(1L, u'test 3'), (0L, u'test 3')], index='group_data'
+        )
+
+        self.assertEqual(3, records[(1L, u'test 3')].pk)
+        self.assertIsNone(records[(0L, u'test 3')])
+        _, index, keys = self.space.connection.requests[0]
+        self.assertEqual(1, index)
+
+    def test_values(self):
+        records = self.queryset.values_list('data', flat=True).in_bulk([2L])
+
+        self.assertEqual({2L: u'test 2'}, records)
+
+    def test_rejects_filter(self):
+        with self.assertRaises(ValueError):
+            self.queryset.filter(group=1L).in_bulk([1L])
+
+    def test_rejects_non_unique_index(self):
+        with self.assertRaises(ValueError):
+            self.queryset.in_bulk([1L], index='group')
+
+        self.assertEqual([], self.space.connection.requests)
+
+    def test_rejects_slicing_and_order(self):
+        with self.assertRaises(ValueError):
+            self.queryset[:1].in_bulk([1L])
+
+        with self.assertRaises(ValueError):
+            self.queryset.order(ORDER_DESC).in_bulk([1L])
@@ -0,0 +1,88 @@
+from mock import MagicMock
+
+from tarantism import Model
+from tarantism import Num64Field
+from tarantism import Session
+from tarantism import StringField
+from tarantism import get_session
+from tarantism.fields import DictField
+from tarantism.queryset import QuerySet
+from tarantism.tests import TestCase
+
+from tests.test_queryset import FakeSpace
+
+
+class FakePrimarySpace(FakeSpace):
+    def select(self, key, **kwargs):
+        rows = super(FakePrimarySpace, self).select(key, **kwargs)
+        return [row for row in rows if key is None or row[0] == key]
+
+
+class SessionTestCase(TestCase):
+    def setUp(self):
+        space = self.space = MagicMock()
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            data = StringField()
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+        self.Record = Record
+        self.fake_space = FakePrimarySpace([[1, 'test'], [2, 'test']])
+        self.queryset = QuerySet(Record, self.fake_space)
+
+    def test_identity(self):
+        with Session() as session:
+            self.assertIs(session, get_session())
+
+            first = self.queryset.get(pk=1L)
+            records = list(self.queryset.all())
+
+            self.assertIs(first, records[0])
+            self.assertIs(first, self.queryset.get(pk=1L))
+            self.assertEqual(2, len(self.fake_space.requests))
+
+        self.assertIsNone(get_session())
+
+    def test_flush(self):
+        with Session() as session:
+            record = self.queryset.get(pk=1L)
+            record.data = u'new'
+            self.queryset.get(pk=2L)
+
+            created = self.Record(pk=3L, data=u'test')
+            session.add(created)
+
+        self.assertEqual(1, self.space.connection.pipeline.call_count)
+        self.space.update.assert_called_once_with(1L, [('=', 1, 'new')])
+        self.space.insert.assert_called_once_with((3L, 'test'))
+        self.assertTrue(created.exists_in_db)
+
+    def test_no_flush_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with Session():
+                self.queryset.get(pk=1L).data = u'new'
+                raise RuntimeError()
+
+        self.assertFalse(self.space.update.called)
+
+    def test_mutable_field_read_not_saved(self):
+        space = self.space
+
+        class Record(Model):
+            pk = Num64Field(primary_key=True)
+            details = DictField()
+
+            @classmethod
+            def get_space(cls):
+                return space
+
+        queryset = QuerySet(Record, FakePrimarySpace([[1, {'key': 'value'}]]))
+
+        with Session():
+            self.assertEqual('value', queryset.get(pk=1L).details['key'])
+
+        self.assertFalse(self.space.update.called)